@@ -1,20 +1,61 @@
-import streamlit as st
-from Fundamental_analysis import run_fundamental_analysis #as fundamental_analysis
-from forensic_audit import run_forensic_analysis
-from react_agent import run_react_agent 
-from openai import OpenAI
-from dotenv import load_dotenv
+import json
 import os
-from langchain.chat_models import ChatOpenAI
-import numpy as np
+import time
+
+import streamlit as st
+from react_agent import get_agent, run_react_agent
+from planner import plan_query, run_planned_analysis
+from llm_factory import openai_api_key
+from run_context import normalize_ticker
+from tracing import trace
+
+
+# Results are shared across sessions: statements for STATEMENTS_TTL, finished
+# analyses (keyed by ticker, query and the statements' content version) for
+# APP_ANALYSIS_CACHE_TTL, see result_cache.py. "Refresh data" re-fetches one
+# ticker for everyone.
+STATEMENTS_TTL_SECONDS = int(os.getenv("APP_STATEMENTS_TTL", str(60 * 60)))
+STATEMENTS_MAX_ENTRIES = int(os.getenv("APP_STATEMENTS_MAX_ENTRIES", "64"))
+
+
+@st.cache_resource
+def refresh_nonces() -> dict:
+    return {}
+
+
+@st.cache_resource
+def consumed_nonces() -> dict:
+    # {ticker: the refresh nonce last fetched with refresh=True}
+    return {}
+
 
+@st.cache_resource
+def analysis_cache():
+    from result_cache import ResultCache
+    return ResultCache()
 
-# Load API key
-load_dotenv()
-openai_api_key = os.getenv("OPENAI_API_KEY")
 
-# ✅ Instantiate LangChain-compatible OpenAI model
-client = ChatOpenAI(model_name="gpt-4o-mini", openai_api_key=openai_api_key)
+@st.cache_resource
+def cached_agent(streaming: bool, api_key: str):
+    return get_agent(streaming=streaming, openai_api_key=api_key)
+
+
+@st.cache_data(ttl=STATEMENTS_TTL_SECONDS, max_entries=STATEMENTS_MAX_ENTRIES, show_spinner="📥 Fetching financial data...")
+def load_statements(ticker: str, nonce: int) -> dict:
+    from data_fetch import get_all_statements, get_company_page, statements_version
+
+    # A nonce not yet consumed means someone pressed refresh: skip the page
+    # cache too, once. Later TTL misses for the same nonce use the page cache.
+    consumed = consumed_nonces()
+    refresh = consumed.get(ticker, 0) != nonce
+    data = get_all_statements(ticker, page=get_company_page(ticker, refresh=refresh))
+    consumed[ticker] = nonce
+    return {"data": data, "version": statements_version(data), "fetched_at": time.time()}
+
+
+def _when(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
 
 # Streamlit UI
 st.set_page_config(page_title="Company Financial Analysis", layout="centered")
@@ -23,25 +64,90 @@ st.title("📊 Fundamental Financial Analysis with AI")
 
 st.title("🧠 ReAct Financial Agent")
 
-ticker = st.text_input("Enter Company Ticker (e.g., TCS, GPIL)", value="GPIL")
+ticker = normalize_ticker(st.text_input("Enter Company Ticker (e.g., TCS, GPIL)", value="GPIL"))
 query = st.text_area("Enter your query", value="Check for red flags and financial health.")
 
+show_timing = st.sidebar.checkbox("⏱️ Show timing panel", value=False)
+
+run_col, refresh_col = st.columns([3, 1])
+run_clicked = run_col.button("Run ReAct Agent")
+if refresh_col.button("🔄 Refresh data"):
+    nonces = refresh_nonces()
+    nonces[ticker] = nonces.get(ticker, 0) + 1
+    st.toast(f"Data for {ticker} will be re-fetched")
+
 # Trigger agent
-if st.button("Run ReAct Agent"):
-    with st.spinner("Thinking..."):
+if run_clicked:
+    from streaming import FinalAnswerStreamHandler, StreamlitTokenHandler
+
+    with st.spinner("Thinking..."), trace("app.run", ticker=ticker) as run_trace:
         try:
-            result = run_react_agent(ticker, query, openai_api_key)
+            nonce = refresh_nonces().get(ticker, 0)
+            statements = load_statements(ticker, nonce)
+            cache_key = (ticker, " ".join(query.split()).lower(), statements["version"], nonce)
+            cached = analysis_cache().get(cache_key)
 
+            # The final answer streams into its placeholder; each tool's
+            # analysis streams below it while the tool runs.
             st.subheader("📋 Final Answer")
-            st.markdown(result["output"])
+            answer_box = st.empty()
+            if cached:
+                result, cached_at = cached
+            else:
+                planned_tools = plan_query(query)
+                if planned_tools:
+                    # Standard query: fixed plan, no agent round trips. With
+                    # several tools each report streams into its own box while
+                    # they run; a lone tool's report is the answer itself.
+                    tool_boxes = {}
+                    if len(planned_tools) > 1:
+                        tool_boxes = {tool: st.expander(f"🛠️ {tool}", expanded=True) for tool in planned_tools}
+                    raw = run_planned_analysis(
+                        ticker, query, planned_tools, openai_api_key(),
+                        callbacks=[StreamlitTokenHandler(answer_box)],
+                        tool_callbacks={tool: [StreamlitTokenHandler(box)] for tool, box in tool_boxes.items()},
+                        statements={ticker: statements["data"]},
+                    )
+                else:
+                    raw = run_react_agent(
+                        ticker, query, openai_api_key(),
+                        callbacks=[FinalAnswerStreamHandler(answer_box)],
+                        tool_callbacks=[StreamlitTokenHandler()],
+                        agent=cached_agent(True, openai_api_key()),
+                        statements={ticker: statements["data"]},
+                    )
+                result = {
+                    "output": raw["output"],
+                    "planned": bool(planned_tools),
+                    "missing_data": raw.get("missing_data", []),
+                    "steps": [(a.tool, a.tool_input, obs) for a, obs in raw.get("intermediate_steps", [])],
+                }
+                cached_at = analysis_cache().put(cache_key, result)
+
+            if result["missing_data"]:
+                st.warning(f"⚠️ Missing data: {', '.join(result['missing_data'])}. Proceeding with available information.")
+            answer_box.markdown(result["output"])
+            st.caption(
+                f"🕒 Data fetched at {_when(statements['fetched_at'])} · "
+                f"analysis {'cached' if cached else 'generated'} at {_when(cached_at)}"
+            )
 
-            st.subheader("🔍 ReAct Agent Trace")
-            for action, observation in result.get("intermediate_steps", []):
-                st.markdown(f"🛠️ **Tool Used**: `{action.tool}`")
-                st.markdown(f"🧾 **Tool Input**: `{action.tool_input}`")
+            st.subheader("🔍 Planner Trace" if result["planned"] else "🔍 ReAct Agent Trace")
+            for tool, tool_input, observation in result["steps"]:
+                st.markdown(f"🛠️ **Tool Used**: `{tool}`")
+                st.markdown(f"🧾 **Tool Input**: `{tool_input}`")
                 st.markdown(f"📤 **Tool Output**:\n```\n{observation}\n```")
                 st.markdown("---")
 
         except Exception as e:
             st.error(f"❌ Agent failed: {e}")
 
+    if show_timing:
+        # Per-stage spans of this run (fetch, parse, summary, prompt, LLM, agent steps).
+        st.subheader("⏱️ Timing")
+        st.dataframe(run_trace.rows(), use_container_width=True)
+        json_col, otlp_col = st.columns(2)
+        json_col.download_button("Download trace (JSON)", run_trace.to_json(indent=1),
+                                 file_name=f"trace_{ticker}.json", mime="application/json")
+        otlp_col.download_button("Download trace (OTLP)", json.dumps(run_trace.to_otlp()),
+                                 file_name=f"trace_{ticker}.otlp.json", mime="application/json")
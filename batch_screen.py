@@ -0,0 +1,170 @@
+# Headless screening over a watchlist: runs the fundamental and/or forensic
+# analysis for every ticker across a process pool, without Streamlit.
+#
+#   python batch_screen.py watchlist.txt --out results.jsonl --workers 4
+#   python batch_screen.py watchlist.txt --out results.jsonl --analyses forensic
+#
+# The watchlist has one ticker per line (a CSV's first column also works;
+# blank lines and # comments are skipped). Each finished ticker is appended
+# to the JSONL output and flushed straight away, and the output doubles as
+# the checkpoint: re-running the same command skips tickers that already
+# have a successful line, so an interrupted run resumes where it stopped.
+# Parsed statements also go into the local statement store
+# (statement_store.py) whenever a ticker reports a new period; --no-store
+# turns that off.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from progress import CallbackProgress, print_progress, silent_progress
+from run_context import RunContext, normalize_ticker, run_context
+
+ANALYSES = ("fundamental", "forensic")
+
+
+def read_watchlist(path: str) -> list:
+    tickers = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            ticker = normalize_ticker(line.split(",", 1)[0])
+            if ticker and ticker not in ("TICKER", "SYMBOL") and ticker not in tickers:
+                tickers.append(ticker)
+    return tickers
+
+
+def completed_tickers(out_path: str, retry_failed: bool = True) -> set:
+    # Tickers already in the output; failed ones are re-run unless retry_failed is off.
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by the interruption
+            if record.get("ok") or not retry_failed:
+                done.add(record["ticker"])
+    return done
+
+
+def _init_worker(rate_per_second: float, verbose: bool):
+    # The Screener rate limit is per process; split it across the pool so
+    # the whole run stays within the configured rate.
+    import http_client
+    from fixtures import wrap_http_client
+
+    http_client._client = wrap_http_client(http_client.FetchClient(rate_per_second=rate_per_second))
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")
+
+
+def screen_ticker(ticker: str, analyses: tuple, model: str, store: bool = True) -> dict:
+    # Runs in a worker process.
+    from Fundamental_analysis import run_fundamental_analysis
+    from forensic_scores import prescreen
+    from forensic_audit import run_forensic_analysis
+    from llm_factory import get_chat_model
+    from metrics import compute_metrics
+    from statement_store import get_statement_store
+
+    runners = {"fundamental": run_fundamental_analysis, "forensic": run_forensic_analysis}
+    from tracing import trace
+
+    record = {"ticker": ticker, "ok": False}
+    started = time.time()
+    with trace("batch.ticker", ticker=ticker) as ticker_trace:
+        try:
+            client = get_chat_model(model)
+            with run_context(RunContext(progress=CallbackProgress(silent_progress))) as ctx:
+                data = ctx.get_statements(ticker)
+                if data.get("error"):
+                    # No page at all: fail the line so a resumed run retries it.
+                    raise RuntimeError(data["error"])
+                if store:
+                    record["stored"] = get_statement_store().ingest(ticker, data)
+                record["metrics"] = compute_metrics(data)
+                screen = prescreen(data, ticker)
+                record["forensic_scores"] = screen.scores
+                record["forensic_flags"] = screen.flags
+                for name in analyses:
+                    record[name] = runners[name](ticker, client)
+            record["ok"] = True
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.time() - started, 2)
+    # {stage: {"count", "total_ms"}} from the ticker's spans.
+    record["timings"] = ticker_trace.stage_totals()
+    record["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    return record
+
+
+def run_batch(tickers: list, analyses: tuple, out_path: str, workers: int = 4, model: str = None,
+              on_progress=print_progress, retry_failed: bool = True, verbose: bool = False,
+              store: bool = True) -> dict:
+    # on_progress(kind, message) receives one "info"/"warning" event per finished ticker.
+    from http_client import RATE_PER_SECOND
+    from llm_factory import DEFAULT_MODEL
+
+    done = completed_tickers(out_path, retry_failed)
+    todo = [t for t in tickers if t not in done]
+    on_progress("status", f"🗂️ {len(tickers)} tickers, {len(done)} already done, {len(todo)} to run")
+    counts = {"ok": 0, "failed": 0, "skipped": len(tickers) - len(todo)}
+    if not todo:
+        return counts
+
+    workers = max(1, min(workers, len(todo)))
+    with open(out_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(RATE_PER_SECOND / workers, verbose),
+    ) as pool:
+        futures = {pool.submit(screen_ticker, t, analyses, model or DEFAULT_MODEL, store): t for t in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            if record["ok"]:
+                counts["ok"] += 1
+                on_progress("info", f"✅ [{i}/{len(todo)}] {record['ticker']} ({record['seconds']}s)")
+            else:
+                counts["failed"] += 1
+                on_progress("warning", f"❌ [{i}/{len(todo)}] {record['ticker']}: {record['error']}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a watchlist of tickers without the Streamlit app.")
+    parser.add_argument("watchlist", help="file with one ticker per line")
+    parser.add_argument("--out", default="screen_results.jsonl", help="JSONL output, also the resume checkpoint")
+    parser.add_argument("--analyses", default="fundamental,forensic", help="comma-separated: fundamental, forensic")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--no-retry-failed", action="store_true", help="on resume, skip tickers that failed before")
+    parser.add_argument("--verbose", action="store_true", help="keep the workers' own log output")
+    parser.add_argument("--no-store", action="store_true", help="don't write parsed statements to the statement store")
+    args = parser.parse_args()
+
+    analyses = tuple(a.strip() for a in args.analyses.split(",") if a.strip())
+    unknown = [a for a in analyses if a not in ANALYSES]
+    if unknown:
+        parser.error(f"unknown analyses: {', '.join(unknown)}")
+
+    counts = run_batch(
+        read_watchlist(args.watchlist), analyses, args.out,
+        workers=args.workers, model=args.model,
+        retry_failed=not args.no_retry_failed, verbose=args.verbose, store=not args.no_store,
+    )
+    print(f"🏁 Done: {counts['ok']} ok, {counts['failed']} failed, {counts['skipped']} skipped -> {args.out}")
+    sys.exit(1 if counts["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
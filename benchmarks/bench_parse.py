@@ -0,0 +1,106 @@
+# Micro-benchmark: full-page BeautifulSoup parse vs the targeted lxml
+# section extraction in page_parser, on saved Screener pages.
+#
+#   python benchmarks/bench_parse.py --pages saved_pages/ --repeat 20
+#
+# Without --pages, every page currently in the on-disk response cache is used.
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from bench_stats import percentile
+from data_fetch import _table_to_df
+from page_parser import STATEMENT_SECTIONS, extract_tables
+
+
+def load_pages(pages_dir):
+    if pages_dir:
+        pages = {}
+        for path in sorted(glob.glob(os.path.join(pages_dir, "*.html"))):
+            with open(path, encoding="utf-8") as f:
+                pages[os.path.basename(path)] = f.read()
+        return pages
+
+    from http_cache import get_response_cache
+
+    cache = get_response_cache()
+    if cache is None:
+        return {}
+    return {url: html for url, _, html in cache.items()}
+
+
+def first_col(section_id):
+    return "Category" if section_id == "shareholding" else "Line Item"
+
+
+def parse_bs4_per_getter(html):
+    # What the getters used to do: one full parse per statement.
+    out = {}
+    for section_id in STATEMENT_SECTIONS:
+        soup = BeautifulSoup(html, "lxml")
+        out[section_id] = _table_to_df(soup.find("section", id=section_id).find("table"), first_col(section_id))
+    return out
+
+
+def parse_bs4_once(html):
+    soup = BeautifulSoup(html, "lxml")
+    return {
+        section_id: _table_to_df(soup.find("section", id=section_id).find("table"), first_col(section_id))
+        for section_id in STATEMENT_SECTIONS
+    }
+
+
+def parse_targeted(html):
+    return extract_tables(html, STATEMENT_SECTIONS)
+
+
+def bench(fn, pages, repeat):
+    timings = []
+    for _ in range(repeat):
+        for html in pages.values():
+            start = time.perf_counter()
+            fn(html)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Screener statement parsing.")
+    parser.add_argument("--pages", help="Directory of saved Screener company pages (*.html)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        sys.exit("❌ No saved pages found. Pass --pages DIR or warm the response cache first.")
+
+    # The fast path must produce exactly what the BeautifulSoup path does.
+    for name, html in pages.items():
+        expected, actual = parse_bs4_once(html), parse_targeted(html)
+        for section_id in STATEMENT_SECTIONS:
+            if not expected[section_id].equals(actual[section_id]):
+                sys.exit(f"❌ Mismatch in {section_id} for {name}")
+
+    avg_kb = statistics.mean(len(h) for h in pages.values()) / 1024
+    print(f"📄 {len(pages)} pages, avg {avg_kb:.0f} KB, {args.repeat} repeats\n")
+    results = [
+        ("bs4, one parse per getter", bench(parse_bs4_per_getter, pages, args.repeat)),
+        ("bs4, one parse per page", bench(parse_bs4_once, pages, args.repeat)),
+        ("targeted lxml sections", bench(parse_targeted, pages, args.repeat)),
+    ]
+    baseline = statistics.median(results[0][1])
+    for label, timings in results:
+        median = statistics.median(timings)
+        p95 = percentile(timings, 95)
+        print(f"{label:<28} median {median:8.2f} ms   p95 {p95:8.2f} ms   {baseline / median:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import math
+
+
+# Shared by the benchmark scripts.
+def percentile(timings, pct: float = 95) -> float:
+    # Nearest-rank percentile: the smallest timing with at least pct% of the
+    # runs at or below it (so p95 of two runs is the slower one).
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
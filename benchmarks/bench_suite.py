@@ -0,0 +1,340 @@
+# End-to-end benchmark suite replaying recorded Screener pages and LLM
+# answers (fixtures.py, FIXTURE_MODE=replay), so timings reflect our code
+# rather than network and model latency.
+#
+#   python benchmarks/bench_suite.py --fixtures benchmarks/fixtures --out results.json
+#   python benchmarks/bench_suite.py --fixtures benchmarks/fixtures --compare results.json
+#
+# Scenarios: one ticker stage by stage (fetch, parse, summarize, prompt
+# build), the default agent query through the planner, a five-peer
+# comparison, and a 500-ticker batch (recorded pages reused under synthetic
+# tickers). Each reports latency per stage and throughput, tracemalloc peak
+# memory and prompt token counts; the whole run is written as JSON so two
+# runs can be compared with --compare.
+#
+# The reference set is the tickers in benchmarks/reference_tickers.txt,
+# recorded once with a real API key:
+#
+#   FIXTURE_MODE=record FIXTURE_DIR=benchmarks/fixtures \
+#       python batch_screen.py benchmarks/reference_tickers.txt --out /tmp/reference.jsonl --workers 1
+#
+# A prompt with no recording (its text changed with the code under test)
+# gets a fixed stub answer instead of failing; each scenario reports how many
+# calls were replayed and how many stubbed.
+import os
+
+os.environ["FIXTURE_MODE"] = "replay"
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stats import percentile
+
+import data_fetch
+import fixtures
+import http_client
+from Fundamental_analysis import build_analysis_prompt
+from fixtures import FixtureChatModel, FixtureHTTPClient, FixtureMessage, FixtureMissing
+from forensic_audit import build_forensic_prompt
+from forensic_scores import forensic_scores
+from llm_cache import llm_temperature
+from llm_factory import DEFAULT_MODEL
+from planner import plan_query, run_planned_analysis
+from peer_comparision import PEER_MODEL, PEER_TEMPERATURE, run_peer_comparison
+from summary_format import count_tokens, tokenizer_name
+
+DEFAULT_QUERY = "Check for red flags and financial health."
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+STUB_ANSWER = "Stub analysis.\n- Score: 70/100\n- Verdict: Caution"
+BATCH_SIZE = 500
+PEER_COUNT = 5
+_TICKER_RE = re.compile(r"/company/([^/]+)/")
+
+
+def recorded_pages(fixture_dir: str) -> dict:
+    # {ticker: url} for every company page recorded with a 200.
+    pages = {}
+    http_dir = os.path.join(fixture_dir, "http")
+    if not os.path.isdir(http_dir):
+        return pages
+    for name in sorted(os.listdir(http_dir)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(http_dir, name), encoding="utf-8") as f:
+            meta = json.load(f)
+        m = _TICKER_RE.search(meta["url"])
+        if m and "/api/" not in meta["url"] and meta["status_code"] == 200:
+            pages.setdefault(m.group(1).upper(), meta["url"])
+    return pages
+
+
+class ReplayPagesClient(FixtureHTTPClient):
+    # Replays recorded responses; company pages for tickers with no recording
+    # (the synthetic batch and peer tickers) are served one of the recorded
+    # pages, picked by ticker hash.
+    def __init__(self, pages: dict):
+        super().__init__()
+        self.pages = pages
+        self.names = sorted(pages)
+
+    def get(self, url, headers=None):
+        m = _TICKER_RE.search(url)
+        if m and "/api/" not in url and m.group(1).upper() not in self.pages:
+            url = self.pages[self.names[zlib.crc32(m.group(1).upper().encode()) % len(self.names)]]
+        return super().get(url, headers=headers)
+
+
+class ReplayChatModel(FixtureChatModel):
+    # Recorded answers, keyed like the production client of the scenario;
+    # counts prompt tokens per call.
+    def __init__(self, model_name: str, temperature):
+        super().__init__(None, model_name, temperature)
+        self._lock = threading.Lock()
+        self.prompt_tokens = []
+        self.replayed = 0
+        self.stubbed = 0
+
+    def invoke(self, messages, config=None, **kwargs):
+        tokens = sum(count_tokens(str(getattr(m, "content", m))) for m in messages)
+        try:
+            response = super().invoke(messages, config=config, **kwargs)
+            replayed = True
+        except FixtureMissing:
+            response, replayed = FixtureMessage(STUB_ANSWER), False
+        with self._lock:
+            self.prompt_tokens.append(tokens)
+            if replayed:
+                self.replayed += 1
+            else:
+                self.stubbed += 1
+        return response
+
+
+def _fresh():
+    # Drop in-process page memo so every run fetches and parses again.
+    with data_fetch._page_cache_lock:
+        data_fetch._page_cache.clear()
+
+
+def _timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        _fresh()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _peak_mb(fn):
+    _fresh()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _stats(timings, items=1):
+    median = statistics.median(timings)
+    return {
+        "median_ms": round(median, 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "per_second": round(items * 1000 / median, 2) if median else None,
+    }
+
+
+def bench_single_ticker(ticker, repeat):
+    url = data_fetch.SCREENER_URL.format(ticker=ticker)
+    html = data_fetch.fetch_html(url, ticker, use_cache=False)
+    page = data_fetch.CompanyPage(ticker, html)
+    data = data_fetch.get_all_statements(ticker, page=page)
+    summary = data_fetch.build_summary_input(data["pnl"], data["cashflow"], data["balance_sheet"], data["shareholding"])
+    stages = {
+        "fetch": lambda: data_fetch.fetch_html(url, ticker, use_cache=False),
+        "parse": lambda: data_fetch.get_all_statements(ticker, page=data_fetch.CompanyPage(ticker, html)),
+        "summarize": lambda: data_fetch.build_summary_input(
+            data["pnl"], data["cashflow"], data["balance_sheet"], data["shareholding"]),
+        "prompt_build": lambda: (build_analysis_prompt(summary), build_forensic_prompt(summary)),
+        "end_to_end": lambda: data_fetch.build_summary_input(
+            *(lambda d: (d["pnl"], d["cashflow"], d["balance_sheet"], d["shareholding"]))(
+                data_fetch.get_all_statements(ticker, page=data_fetch.get_company_page(ticker)))),
+    }
+    result = {name: _stats(_timed(fn, repeat)) for name, fn in stages.items()}
+    result["peak_memory_mb"] = round(_peak_mb(stages["end_to_end"]), 2)
+    result["tokens"] = {
+        "summary": count_tokens(summary),
+        "fundamental_prompt": count_tokens(build_analysis_prompt(summary)),
+        "forensic_prompt": count_tokens(build_forensic_prompt(summary)),
+    }
+    return result
+
+
+def _llm_scenario(run, model_name, temperature, repeat):
+    timings, llm = [], None
+    for _ in range(repeat):
+        llm = ReplayChatModel(model_name, temperature)
+        _fresh()
+        start = time.perf_counter()
+        run(llm)
+        timings.append((time.perf_counter() - start) * 1000)
+    result = _stats(timings)
+    result["peak_memory_mb"] = round(_peak_mb(lambda: run(ReplayChatModel(model_name, temperature))), 2)
+    result["llm_calls"] = len(llm.prompt_tokens)
+    result["llm_replayed"] = llm.replayed
+    result["llm_stubbed"] = llm.stubbed
+    result["prompt_tokens"] = sum(llm.prompt_tokens)
+    result["prompt_tokens_per_call"] = llm.prompt_tokens
+    return result
+
+
+def bench_default_query(ticker, repeat):
+    tools = plan_query(DEFAULT_QUERY)
+    return _llm_scenario(lambda llm: run_planned_analysis(ticker, DEFAULT_QUERY, tools, client=llm),
+                         DEFAULT_MODEL, None, repeat)
+
+
+def bench_peer_comparison(ticker, peers, repeat):
+    return _llm_scenario(lambda llm: run_peer_comparison(ticker, peer_tickers=peers, client=llm),
+                         PEER_MODEL, llm_temperature(PEER_TEMPERATURE), repeat)
+
+
+def bench_batch(size):
+    tickers = [f"BENCH{i:04d}" for i in range(size)]
+    timings = {}
+
+    def run():
+        start = time.perf_counter()
+        results = data_fetch.fetch_many_sync(tickers)
+        sets = [r.data for r in results.values() if r.ok]
+        timings["fetch_parse"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        summaries = [data_fetch.build_summary_input(d["pnl"], d["cashflow"], d["balance_sheet"], d["shareholding"])
+                     for d in sets]
+        timings["summarize"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        scores = forensic_scores(sets)
+        timings["forensic_scores"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        prompts = [build_analysis_prompt(s) for s in summaries]
+        timings["prompt_build"] = (time.perf_counter() - start) * 1000
+        return sets, scores, prompts
+
+    _fresh()
+    start = time.perf_counter()
+    sets, scores, prompts = run()
+    total = (time.perf_counter() - start) * 1000
+    result = {
+        stage: {"total_ms": round(ms, 1), "per_second": round(size * 1000 / ms, 1) if ms else None}
+        for stage, ms in timings.items()
+    }
+    result["end_to_end"] = {"total_ms": round(total, 1), "per_second": round(size * 1000 / total, 1)}
+    result["fetched"] = len(sets)
+    result["needs_llm_audit"] = int(scores["needs_audit"].sum())
+    result["prompt_tokens"] = sum(count_tokens(p) for p in prompts)
+    result["peak_memory_mb"] = round(_peak_mb(run), 2)
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _flatten(d, prefix=""):
+    out = {}
+    for key, value in d.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            out.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+def compare(previous: dict, current: dict):
+    before, after = _flatten(previous["scenarios"]), _flatten(current["scenarios"])
+    print(f"\n📊 vs {previous['meta'].get('commit')} ({previous['meta'].get('timestamp')})")
+    for name in sorted(after):
+        if name in before and before[name] and (name.endswith("_ms") or "tokens" in name or "memory" in name):
+            change = (after[name] - before[name]) / before[name]
+            print(f"{name:<48}{before[name]:>12.2f}{after[name]:>12.2f}{change:>+9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fetch, parse, summarize, prompt build and e2e runs.")
+    parser.add_argument("--fixtures", default=os.getenv("FIXTURE_DIR", DEFAULT_FIXTURE_DIR),
+                        help="fixture directory recorded with FIXTURE_MODE=record")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--latency", default="0",
+                        help='simulated latency per replayed call: seconds, or "recorded" (FIXTURE_LATENCY)')
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    fixtures.FIXTURE_DIR = args.fixtures
+    fixtures.FIXTURE_LATENCY = args.latency
+    pages = recorded_pages(args.fixtures)
+    if not pages:
+        sys.exit(f"❌ No recorded company pages in {args.fixtures}. Record the reference set first (see the top of this file).")
+    http_client._client = ReplayPagesClient(pages)
+
+    names = sorted(pages)
+    target = names[0]
+    peers = [names[(i + 1) % len(names)] if len(names) > PEER_COUNT else f"PEER{i}" for i in range(PEER_COUNT)]
+
+    print(f"📄 {len(pages)} pages, tokenizer: {tokenizer_name()}, repeat {args.repeat}")
+    scenarios = {}
+    for name, run in (
+        ("single_ticker", lambda: bench_single_ticker(target, args.repeat)),
+        ("default_agent_query", lambda: bench_default_query(target, args.repeat)),
+        ("five_peer_comparison", lambda: bench_peer_comparison(target, peers, args.repeat)),
+        (f"batch_{args.batch_size}", lambda: bench_batch(args.batch_size)),
+    ):
+        print(f"⏱️ {name}...", flush=True)
+        scenarios[name] = run()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pages": len(pages),
+            "tokenizer": tokenizer_name(),
+            "repeat": args.repeat,
+            "fixtures": args.fixtures,
+            "latency": args.latency,
+        },
+        "scenarios": scenarios,
+    }
+    print(json.dumps(scenarios, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"📝 Results written to {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Prompt-size report: tokens per company for the verbose summary block vs
+# the compact serializer in summary_format, on saved Screener pages, plus
+# the size of a five-peer comparison data section in each format.
+#
+#   python benchmarks/bench_summary.py --pages saved_pages/
+#
+# Without --pages, every page currently in the on-disk response cache is used.
+# Token counts use tiktoken if installed, otherwise a chars/4 estimate.
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parse import load_pages
+
+from data_fetch import CompanyPage, build_verbose_summary, get_all_statements
+from summary_format import SUMMARY_TOKEN_BUDGET, budgeted_summary, count_tokens, tokenizer_name
+
+PEER_GROUP = 6  # target + five peers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare prompt summary sizes.")
+    parser.add_argument("--pages", help="Directory of saved Screener company pages (*.html)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        sys.exit("❌ No saved pages found. Pass --pages DIR or warm the response cache first.")
+
+    verbose, compact = [], []
+    for name, html in pages.items():
+        data = get_all_statements(name, page=CompanyPage(name, html))
+        verbose.append(count_tokens(build_verbose_summary(
+            data["pnl"], data["cashflow"], data["balance_sheet"], data["shareholding"])))
+        compact.append(count_tokens(budgeted_summary(data)))
+
+    print(f"📄 {len(pages)} pages, tokenizer: {tokenizer_name()}, budget {SUMMARY_TOKEN_BUDGET} tokens\n")
+    for label, counts in (("verbose", verbose), ("compact", compact)):
+        median = statistics.median(counts)
+        print(f"{label:<10} median {median:6.0f}   max {max(counts):6d}   "
+              f"{PEER_GROUP}-company peer block ~{median * PEER_GROUP:6.0f} tokens")
+    print(f"\n📉 {1 - statistics.median(compact) / statistics.median(verbose):.0%} fewer summary tokens per company")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Import-time budget: imports each entry module in a fresh interpreter with
+# `python -X importtime`, and fails if one takes longer than its budget in
+# import_budget.json or eagerly pulls in a module listed under "deferred"
+# (langchain/openai are only meant to load on the first LLM call, see
+# llm_factory.py).
+#
+#   python benchmarks/import_budget.py              # check, exit 1 on regression
+#   python benchmarks/import_budget.py --update     # re-baseline the budgets
+#
+# Budgets are the median of --repeat runs plus a fixed --margin, in
+# milliseconds, so a regression of more than the margin fails whatever the
+# module's size. A module that imports another in the file never gets a
+# smaller budget than it.
+# A module that fails to import fails the check (and is never re-baselined)
+# unless --allow-missing is given, e.g. on a machine without streamlit.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+
+
+def import_profile(module):
+    # One cold import: (cumulative ms for module, top-level packages loaded, error or None).
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    cumulative_ms, loaded = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded.add(name.strip().split(".")[0])
+        if name == " " + module:  # top level of the import tree
+            cumulative_ms = int(cumulative) / 1000
+    error = proc.stderr.strip().splitlines()[-1] if proc.returncode else None
+    return cumulative_ms, loaded, error
+
+
+def measure(module, repeat):
+    runs, loaded = [], set()
+    for _ in range(repeat):
+        ms, modules, error = import_profile(module)
+        if error:
+            return None, loaded, error
+        runs.append(ms or 0.0)
+        loaded |= modules
+    return statistics.median(runs), loaded, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check module import times against a budget.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--update", action="store_true", help="rewrite budgets from this run")
+    parser.add_argument("--margin", type=float, default=100, help="ms added to the measured median on --update")
+    parser.add_argument("--allow-missing", action="store_true", help="skip modules that fail to import")
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH, encoding="utf-8") as f:
+        budget = json.load(f)
+
+    failed = False
+    imports = {}
+    print(f"{'module':<24}{'median ms':>12}{'budget ms':>12}")
+    for module, limit in budget["modules"].items():
+        ms, loaded, error = measure(module, args.repeat)
+        if error:
+            if args.allow_missing:
+                print(f"{module:<24}{'-':>12}{limit:>12.0f}   ⚠️ skipped, import failed: {error}")
+            else:
+                failed = True
+                print(f"{module:<24}{'-':>12}{limit:>12.0f}   ❌ import failed: {error}")
+            continue
+        eager = sorted(loaded & set(budget["deferred"]))
+        status = "✅"
+        if eager:
+            status, failed = f"❌ imports {', '.join(eager)} eagerly", True
+        elif ms > limit and not args.update:
+            status, failed = "❌ over budget", True
+        print(f"{module:<24}{ms:>12.1f}{limit:>12.0f}   {status}")
+        if args.update:
+            budget["modules"][module] = round(ms + args.margin)
+            imports[module] = loaded
+
+    if args.update and failed:
+        sys.exit("❌ Not writing budgets: fix the failures above first.")
+    if args.update:
+        # Smallest modules first, so a chain a -> b -> c settles in one pass.
+        for module in sorted(imports, key=lambda m: len(imports[m])):
+            for dependency in imports[module] & set(budget["modules"]) - {module}:
+                budget["modules"][module] = max(budget["modules"][module], budget["modules"][dependency])
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"📝 Budgets written to {BUDGET_PATH}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
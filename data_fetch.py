@@ -1,88 +1,434 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 import numpy as np
 
+from http_cache import get_response_cache
+from http_client import get_client
+from metrics import compute_metrics
+from statements import NumericStatement, as_statement, format_value
+from page_parser import STATEMENT_SECTIONS, find_section_ids, fragment_to_df, slice_sections
+from single_flight import SingleFlight
+from summary_format import budgeted_summary
+from tracing import annotate, in_context, span
 
-def get_profit_loss_df(ticker: str) -> pd.DataFrame:
-    print(f"📥 Fetching Profit & Loss data for {ticker}...")
-    url = f"https://www.screener.in/company/{ticker}/consolidated/"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        soup = BeautifulSoup(requests.get(url, headers=headers).text, "lxml")
-        table = soup.find("section", id="profit-loss").find("table")
-        if not table:
-            raise ValueError("Profit & Loss table not found on page.")
-        headers = [th.text.strip() for th in table.select("thead tr th")]
-        rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
-        df = pd.DataFrame(rows, columns=headers)
-        if "Line Item" not in df.columns:
-            df.columns = ["Line Item"] + list(df.columns[1:])
-        print("✅ Profit & Loss data fetched successfully.")
-        return df
-    except Exception as e:
-        print(f"❌ Error fetching P&L: {e}")
-        return pd.DataFrame(columns=["Line Item"])
-
-def get_cashflow_df(ticker: str) -> pd.DataFrame:
-    print(f"📥 Fetching Cash Flow data for {ticker}...")
-    url = f"https://www.screener.in/company/{ticker}/consolidated/"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        soup = BeautifulSoup(requests.get(url, headers=headers).text, "lxml")
-        table = soup.find("section", id="cash-flow").find("table")
-        if not table:
-            raise ValueError("Cash Flow table not found on page.")
-        headers = [th.text.strip() for th in table.select("thead tr th")]
-        rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
-        df = pd.DataFrame(rows, columns=headers)
-        if "Line Item" not in df.columns:
-            df.columns = ["Line Item"] + list(df.columns[1:])
-        print("✅ Cash Flow data fetched successfully.")
-        return df
-    except Exception as e:
-        print(f"❌ Error fetching Cash Flow: {e}")
-        return pd.DataFrame(columns=["Line Item"])
-
-def get_balance_sheet_df(ticker: str) -> pd.DataFrame:
-    print(f"📥 Fetching Balance Sheet data for {ticker}...")
-    url = f"https://www.screener.in/company/{ticker}/consolidated/"
-    headers = {"User-Agent": "Mozilla/5.0"}
+
+SCREENER_URL = "https://www.screener.in/company/{ticker}/consolidated/"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# A page fetched for one getter is reused by the others for this long, so the
+# four statements of one analysis cost a single download and a single parse.
+PAGE_TTL_SECONDS = 300
+# Parsed pages kept in memory at most; least recently used go first, and
+# expired ones are dropped whenever a page is added.
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("SCREENER_PAGE_CACHE_MAX_ENTRIES", "32"))
+
+# Upper bound on tickers fetched at once by fetch_many(); the shared client's
+# token bucket still paces the actual requests to Screener.
+FETCH_CONCURRENCY = int(os.getenv("SCREENER_FETCH_CONCURRENCY", "8"))
+
+STATEMENT_KEYS = {
+    "pnl": "profit-loss",
+    "cashflow": "cash-flow",
+    "balance_sheet": "balance-sheet",
+    "shareholding": "shareholding",
+}
+
+_page_cache = OrderedDict()
+_page_cache_lock = threading.Lock()
+
+# Concurrent requests for the same ticker share one download (keyed by
+# ticker) and, on the shared page, one parse per section; fetch_many() also
+# shares whole-ticker fetches between overlapping calls. See single_flight.py.
+_page_flight = SingleFlight()
+_statements_flight = SingleFlight()
+
+log = logging.getLogger(__name__)
+
+
+def fetch_html(url: str, ticker: str, use_cache: bool = True) -> str:
+    # Serve from the on-disk cache while fresh; once stale, revalidate with
+    # ETag/Last-Modified so an unchanged page costs a 304 instead of a download.
+    # The span's bytes are what came over the network (0 for a cache hit or 304).
+    with span("http.fetch", ticker=ticker, url=url) as s:
+        cache = get_response_cache()
+        entry = None
+        if cache is not None and use_cache:
+            entry, fresh = cache.get(url)
+            if fresh:
+                s.set(cache="hit", bytes=0, page_chars=len(entry.text))
+                return entry.text
+        headers = dict(HEADERS)
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+        resp = get_client().get(url, headers=headers)
+        s.set(status_code=resp.status_code)
+        if resp.status_code == 304 and entry is not None:
+            cache.touch(url)
+            s.set(cache="revalidated", bytes=0, page_chars=len(entry.text))
+            return entry.text
+        resp.raise_for_status()
+        s.set(cache="miss" if cache is not None else "off", bytes=len(resp.content), page_chars=len(resp.text))
+        if cache is not None:
+            cache.put(
+                url, ticker, resp.text,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+        return resp.text
+
+
+def purge_cache(ticker: str = None) -> int:
+    with _page_cache_lock:
+        if ticker is None:
+            _page_cache.clear()
+        else:
+            _page_cache.pop(ticker, None)
+    cache = get_response_cache()
+    return cache.purge(ticker) if cache is not None else 0
+
+
+def cache_stats() -> dict:
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def _table_to_df(table, first_col: str) -> pd.DataFrame:
+    headers = [th.text.strip() for th in table.select("thead tr th")]
+    rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
+    df = pd.DataFrame(rows, columns=headers)
+    if first_col not in df.columns:
+        df.columns = [first_col] + list(df.columns[1:])
+    return df
+
+
+class CompanyPage:
+    # One downloaded Screener company page. Every <section id=...> on it
+    # (profit-loss, cash-flow, balance-sheet, shareholding, quarters, ratios,
+    # ...) is available as a DataFrame view through table(). Only the sections
+    # actually asked for are parsed; the full BeautifulSoup tree is built
+    # lazily, and only if something touches .soup.
+
+    def __init__(self, ticker: str, html: str):
+        self.ticker = ticker
+        self.html = html
+        self.fetched_at = time.time()
+        self._soup = None
+        self._fragments = {}
+        self._tables = {}
+        # Pages are shared between threads: each section is parsed once
+        # however many callers ask for it at the same time.
+        self._lock = threading.Lock()
+        self._section_flight = SingleFlight()
+
+    @classmethod
+    def fetch(cls, ticker: str, use_cache: bool = True) -> "CompanyPage":
+        url = SCREENER_URL.format(ticker=ticker)
+        return cls(ticker, fetch_html(url, ticker, use_cache=use_cache))
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        with self._lock:
+            if self._soup is None:
+                self._soup = BeautifulSoup(self.html, "lxml")
+            return self._soup
+
+    @property
+    def section_ids(self) -> list:
+        return find_section_ids(self.html)
+
+    def _fragment(self, section_id: str):
+        with self._lock:
+            if section_id not in self._fragments:
+                # One scan picks up all four statements, since callers ask for them together.
+                wanted = (set(STATEMENT_SECTIONS) | {section_id}) - set(self._fragments)
+                self._fragments.update(slice_sections(self.html, wanted))
+            return self._fragments.get(section_id)
+
+    def _coalesced(self, key, build):
+        # self._tables[key], built once even when several threads ask at the
+        # same moment: the first builds it, the rest wait for that result.
+        if key not in self._tables:
+            if self._section_flight.in_flight(key):
+                annotate(coalesced=True)
+            self._section_flight.do(key, lambda: self._store(key, build))
+        return self._tables[key]
+
+    def _store(self, key, build):
+        if key not in self._tables:
+            self._tables[key] = build()
+
+    def table(self, section_id: str, first_col: str = "Line Item") -> pd.DataFrame:
+        return self._coalesced(section_id, lambda: self._parse_table(section_id, first_col)).copy()
+
+    def _parse_table(self, section_id: str, first_col: str) -> pd.DataFrame:
+        with span("html.parse", ticker=self.ticker, section=section_id) as s:
+            fragment = self._fragment(section_id)
+            if fragment is None:
+                raise ValueError(f"No table found in section '{section_id}'.")
+            try:
+                df = fragment_to_df(fragment, first_col)
+            except ValueError:
+                raise ValueError(f"No table found in section '{section_id}'.")
+            except Exception:
+                # Malformed fragment: fall back to the full-page BeautifulSoup parse.
+                s.set(fallback="soup")
+                section = self.soup.find("section", id=section_id)
+                table = section.find("table") if section else None
+                if not table:
+                    raise ValueError(f"No table found in section '{section_id}'.")
+                df = _table_to_df(table, first_col)
+            s.set(rows=len(df), columns=len(df.columns))
+            return df
+
+    def statement(self, section_id: str, first_col: str = "Line Item", keep_raw: bool = False) -> NumericStatement:
+        # Parsed to float64 once per page and reused by every caller. The raw
+        # cell strings are only kept when asked for (the statement store).
+        return self._coalesced(
+            ("numeric", section_id, keep_raw),
+            lambda: NumericStatement.from_frame(self.table(section_id, first_col), keep_raw=keep_raw),
+        )
+
+    @property
+    def profit_loss(self) -> pd.DataFrame:
+        return self.table("profit-loss")
+
+    @property
+    def cash_flow(self) -> pd.DataFrame:
+        return self.table("cash-flow")
+
+    @property
+    def balance_sheet(self) -> pd.DataFrame:
+        return self.table("balance-sheet")
+
+    @property
+    def shareholding(self) -> pd.DataFrame:
+        return self.table("shareholding", first_col="Category")
+
+
+def _cached_page(ticker: str):
+    with _page_cache_lock:
+        cached = _page_cache.get(ticker)
+        if cached is None:
+            return None
+        if time.time() - cached.fetched_at >= PAGE_TTL_SECONDS:
+            del _page_cache[ticker]
+            return None
+        _page_cache.move_to_end(ticker)
+        return cached
+
+
+def _remember_page(ticker: str, page: CompanyPage):
+    now = time.time()
+    with _page_cache_lock:
+        for stale in [t for t, p in _page_cache.items() if now - p.fetched_at >= PAGE_TTL_SECONDS]:
+            del _page_cache[stale]
+        _page_cache[ticker] = page
+        _page_cache.move_to_end(ticker)
+        while len(_page_cache) > PAGE_CACHE_MAX_ENTRIES:
+            _page_cache.popitem(last=False)
+
+
+def _load_page(ticker: str, refresh: bool) -> CompanyPage:
+    # Checked again here: the flight a caller missed may have just finished.
+    page = None if refresh else _cached_page(ticker)
+    if page is None:
+        # refresh=True bypasses both the in-memory page and the on-disk cache.
+        page = CompanyPage.fetch(ticker, use_cache=not refresh)
+        _remember_page(ticker, page)
+    return page
+
+
+def get_company_page(ticker: str, refresh: bool = False) -> CompanyPage:
+    page = None if refresh else _cached_page(ticker)
+    if page is not None:
+        return page
+    # Concurrent misses for one ticker share a single download and parse.
+    key = (ticker, refresh)
+    if _page_flight.in_flight(key):
+        annotate(coalesced=True)
+    return _page_flight.do(key, lambda: _load_page(ticker, refresh))
+
+
+def _get_section_df(ticker, page, section_id, label, error_label, first_col="Line Item"):
+    # A missing or broken section comes back empty; the error stays on the span.
+    with span("statement", ticker=ticker, section=section_id) as s:
+        try:
+            page = page or get_company_page(ticker)
+            try:
+                df = page.table(section_id, first_col=first_col)
+            except ValueError:
+                raise ValueError(f"{label} table not found on page.")
+            s.set(rows=len(df))
+            return df
+        except Exception as e:
+            s.fail(e)
+            log.warning("Could not get %s for %s: %s", error_label, ticker, e)
+            return pd.DataFrame(columns=[first_col])
+
+
+def get_profit_loss_df(ticker: str, page: CompanyPage = None) -> pd.DataFrame:
+    return _get_section_df(ticker, page, "profit-loss", "Profit & Loss", "P&L")
+
+def get_cashflow_df(ticker: str, page: CompanyPage = None) -> pd.DataFrame:
+    return _get_section_df(ticker, page, "cash-flow", "Cash Flow", "Cash Flow")
+
+def get_balance_sheet_df(ticker: str, page: CompanyPage = None) -> pd.DataFrame:
+    return _get_section_df(ticker, page, "balance-sheet", "Balance Sheet", "Balance Sheet")
+
+def get_shareholding_pattern(ticker: str, page: CompanyPage = None) -> pd.DataFrame:
+    return _get_section_df(
+        ticker, page, "shareholding", "Shareholding Pattern", "Shareholding Pattern", first_col="Category"
+    )
+
+def _first_col(section_id: str) -> str:
+    return "Category" if section_id == "shareholding" else "Line Item"
+
+
+def empty_statements(ticker: str, error: str = None) -> dict:
+    # What get_all_statements() returns when the page itself cannot be had;
+    # "error" says why.
+    data = {"ticker": ticker}
+    for key in STATEMENT_KEYS:
+        data[key] = NumericStatement.from_frame(None)
+    if error:
+        data["error"] = error
+    return data
+
+
+def get_all_statements(ticker: str, page: CompanyPage = None, keep_raw: bool = False) -> dict:
+    # The statement set every analysis works from: {"ticker", "pnl",
+    # "cashflow", "balance_sheet", "shareholding"} as the page's cached
+    # NumericStatements, so the tables are parsed once per page whoever
+    # reads them. The DataFrame getters above remain for older callers.
+    #
+    # A page that cannot be downloaded (404, 5xx, timeout) gives four empty
+    # statements, like a page missing its tables; callers show "Missing
+    # data". _fetch_statements() fetches the page first so fetch_many()
+    # still sees the error.
+    if page is None:
+        with span("statements", ticker=ticker) as s:
+            try:
+                page = get_company_page(ticker)
+            except Exception as e:
+                s.fail(e)
+                log.warning("Could not fetch the page for %s: %s", ticker, e)
+                return empty_statements(ticker, error=f"{type(e).__name__}: {e}")
+    return get_numeric_statements(ticker, page=page, keep_raw=keep_raw)
+
+
+def statements_version(data: dict) -> str:
+    # Content hash of a get_all_statements() result: unchanged figures give
+    # the same version however often the page is re-fetched.
+    digest = hashlib.sha1()
+    for key in STATEMENT_KEYS:
+        values = as_statement(data.get(key)).values
+        if not values.empty:
+            digest.update(key.encode())
+            digest.update(pd.util.hash_pandas_object(values).values.tobytes())
+            digest.update("|".join(map(str, values.columns)).encode())
+    return digest.hexdigest()[:16]
+
+
+def get_numeric_statements(ticker: str, page: CompanyPage = None, keep_raw: bool = False) -> dict:
+    # Same keys as get_all_statements(), as NumericStatements. Missing or
+    # broken sections come back as empty statements; the error stays on the span.
+    page = page or get_company_page(ticker)
+    data = {"ticker": ticker}
+    for key, section_id in STATEMENT_KEYS.items():
+        with span("statement", ticker=ticker, section=section_id) as s:
+            try:
+                data[key] = page.statement(section_id, _first_col(section_id), keep_raw=keep_raw)
+                s.set(rows=len(data[key].values))
+            except Exception as e:
+                s.fail(e)
+                log.warning("Could not get %s for %s: %s", section_id, ticker, e)
+                data[key] = NumericStatement.from_frame(None)
+    return data
+
+
+class FetchResult:
+    def __init__(self, ticker: str, data: dict = None, error: Exception = None):
+        self.ticker = ticker
+        self.data = data
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"FetchResult({self.ticker!r}, {status})"
+
+
+def _fetch_statements(ticker: str, refresh: bool = False) -> dict:
+    # Fetch the page outside the getters so a download failure surfaces as an
+    # error for this ticker instead of four empty frames.
+    page = get_company_page(ticker, refresh=refresh)
+    return get_all_statements(ticker, page=page)
+
+
+async def fetch_many(tickers, concurrency: int = FETCH_CONCURRENCY, timeout: float = None, refresh: bool = False):
+    # Yields a FetchResult per ticker as soon as it completes (not in input
+    # order). At most `concurrency` tickers are in flight; `timeout` bounds
+    # each ticker separately.
+    semaphore = asyncio.Semaphore(concurrency)
+    # Own pool rather than the loop's default one, so a ticker that blew its
+    # timeout is abandoned instead of being waited for at loop shutdown.
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    fetch = in_context(_fetch_statements)
+
+    async def _one(ticker):
+        async with semaphore:
+            try:
+                # Overlapping fetch_many() calls share each ticker's fetch.
+                work = _statements_flight.do_async((ticker, refresh), partial(fetch, ticker, refresh), pool)
+                data = await (asyncio.wait_for(work, timeout) if timeout else work)
+                return FetchResult(ticker, data=data)
+            except asyncio.TimeoutError:
+                return FetchResult(ticker, error=TimeoutError(f"{ticker} timed out after {timeout}s"))
+            except Exception as e:
+                return FetchResult(ticker, error=e)
+
+    tasks = [asyncio.ensure_future(_one(t)) for t in dict.fromkeys(tickers)]
     try:
-        soup = BeautifulSoup(requests.get(url, headers=headers).text, "lxml")
-        table = soup.find("section", id="balance-sheet").find("table")
-        if not table:
-            raise ValueError("Balance Sheet table not found on page.")
-        headers = [th.text.strip() for th in table.select("thead tr th")]
-        rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
-        df = pd.DataFrame(rows, columns=headers)
-        if "Line Item" not in df.columns:
-            df.columns = ["Line Item"] + list(df.columns[1:])
-        print("✅ Balance Sheet data fetched successfully.")
-        return df
-    except Exception as e:
-        print(f"❌ Error fetching Balance Sheet: {e}")
-        return pd.DataFrame(columns=["Line Item"])
-
-def get_shareholding_pattern(ticker: str) -> pd.DataFrame:
-    print(f"📥 Fetching Shareholding Pattern data for {ticker}...")
-    url = f"https://www.screener.in/company/{ticker}/consolidated/"
-    headers = {"User-Agent": "Mozilla/5.0"}
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_many_sync(tickers, concurrency: int = FETCH_CONCURRENCY, timeout: float = None,
+                    refresh: bool = False, on_result=None) -> dict:
+    # Blocking wrapper around fetch_many() for sync callers. Returns
+    # {ticker: FetchResult}; on_result(result) is called as each one lands.
+    async def _collect():
+        results = {}
+        async for result in fetch_many(tickers, concurrency=concurrency, timeout=timeout, refresh=refresh):
+            results[result.ticker] = result
+            if on_result:
+                on_result(result)
+        return results
+
     try:
-        soup = BeautifulSoup(requests.get(url, headers=headers).text, "lxml")
-        table = soup.find("section", id="shareholding").find("table")
-        if not table:
-            raise ValueError("Shareholding table not found on page.")
-        headers = [th.text.strip() for th in table.select("thead tr th")]
-        rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
-        df = pd.DataFrame(rows, columns=headers)
-        if "Category" not in df.columns:
-            df.columns = ["Category"] + list(df.columns[1:])
-        print("✅ Shareholding data fetched successfully.")
-        return df
-    except Exception as e:
-        print(f"❌ Error fetching Shareholding Pattern: {e}")
-        return pd.DataFrame(columns=["Category"])
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_collect())
+    # Already inside an event loop (e.g. a notebook): run on a helper thread.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(in_context(asyncio.run), _collect()).result()
 
 # def build_summary_input(pl_df, cf_df, bs_df, sh_df) -> str:
 #     def _get_row(df, regex):
@@ -152,70 +498,69 @@ def get_shareholding_pattern(ticker: str) -> pd.DataFrame:
 # - FII Holding: {fii_holding}
 # '''
 
-def build_summary_input(pl_df, cf_df, bs_df, sh_df) -> str:
-    def _get_row(df, regex):
-        if "Line Item" not in df.columns:
-            return pd.Series(["N/A (missing)"] * 10)
-        match = df[df["Line Item"].str.contains(regex, case=False, na=False)]
-        if not match.empty:
-            return match.iloc[0]
-        return pd.Series(["N/A (missing)"] * len(df.columns))
+def build_summary_input(pl_df, cf_df, bs_df, sh_df, ticker: str = None) -> str:
+    # Compact, token-budgeted form used by the prompts (see summary_format.py).
+    return budgeted_summary(
+        {"ticker": ticker, "pnl": pl_df, "cashflow": cf_df, "balance_sheet": bs_df, "shareholding": sh_df}
+    )
 
-    def _get_latest(df, regex):
-        row = _get_row(df, regex)
-        return row.iloc[-1] if isinstance(row, pd.Series) and not row.empty else "N/A (missing)"
 
-    def _to_num(x):
-        try:
-            return float(str(x).split()[0].replace(",", ""))
-        except:
-            return float("nan")
+def build_verbose_summary(pl_df, cf_df, bs_df, sh_df) -> str:
+    # The previous, decorated summary block; kept for size comparisons.
+    # Accepts the getters' raw frames or NumericStatements; raw frames are
+    # parsed once here. Rows are looked up by canonical key through each
+    # statement's line-item index (see line_items.py), not by regex.
+    pl, cf, bs, sh = (as_statement(x) for x in (pl_df, cf_df, bs_df, sh_df))
+
+    def _get_latest(stmt, key):
+        if stmt.label_for(key) is None:
+            return "N/A (missing)"
+        return format_value(stmt.latest_for(key, include_ttm=True), stmt.unit_for(key))
+
+    def last_n_years(stmt, key, n=5):
+        if stmt.label_for(key) is None:
+            return ["N/A (missing)"] * n
+        return [format_value(v, stmt.unit_for(key)) for v in stmt.get(key).iloc[-n:]]
 
     # Balance Sheet values
-    total_assets = _get_latest(bs_df, r"Total Assets")
-    borrowings = _get_latest(bs_df, r"Borrowings")
-    cash_equiv = _get_latest(bs_df, r"Cash")
-    curr_assets = _get_latest(bs_df, r"Current Assets")
-    curr_liab = _get_latest(bs_df, r"Current Liabilities")
+    total_assets = _get_latest(bs, "total_assets")
+    borrowings = _get_latest(bs, "borrowings")
+    cash_equiv = _get_latest(bs, "cash")
 
+    curr_assets = bs.latest_for("current_assets")
+    curr_liab = bs.latest_for("current_liabilities")
     current_ratio = (
-        round(_to_num(curr_assets) / _to_num(curr_liab), 2)
-        if all(map(pd.notnull, [_to_num(curr_assets), _to_num(curr_liab)]))
+        round(curr_assets / curr_liab, 2)
+        if pd.notnull(curr_assets) and pd.notnull(curr_liab) and curr_liab
         else "N/A (missing)"
     )
 
     # Shareholding
-    try:
-        promoter_row = sh_df[sh_df.columns[0]].str.lower().str.contains("promoter")
-        promoter_holding = sh_df.loc[promoter_row].iloc[0, -1] if promoter_row.any() else "N/A (missing)"
-    except:
-        promoter_holding = "N/A (missing)"
+    promoter_holding = _get_latest(sh, "promoters")
+    fii_holding = _get_latest(sh, "fii")
 
-    try:
-        fii_row = sh_df[sh_df.columns[0]].str.lower().str.contains("fii")
-        fii_holding = sh_df.loc[fii_row].iloc[0, -1] if fii_row.any() else "N/A (missing)"
-    except:
-        fii_holding = "N/A (missing)"
+    # Ratios and trends, computed once in NumPy instead of by the model
+    m = compute_metrics({"pnl": pl, "cashflow": cf, "balance_sheet": bs, "shareholding": sh})
 
-    # P&L and Cash Flow
-    sales_row = _get_row(pl_df, r"Sales")
-    net_profit_row = _get_row(pl_df, r"Net Profit")
-    cfo_row = _get_row(cf_df, r"Cash from Operating|Cash Flow from Ops")
+    def _pct(key):
+        return "N/A" if m[key] is None else f"{m[key]:+.1f}%"
 
-    def last_n_years(row, n=5):
-        try:
-            return [x if x else "N/A (missing)" for x in row[-n:].tolist()]
-        except:
-            return ["N/A (missing)"] * n
+    def _level(key):
+        return "N/A" if m[key] is None else f"{m[key]:.1f}%"
+
+    def _pp(key):
+        return "N/A" if m[key] is None else f"{m[key]:+.1f} pp"
+
+    def _x(key):
+        return "N/A" if m[key] is None else f"{m[key]:.2f}"
 
     return f"""
 📈 Profit & Loss (last 5 years):
-- Sales: {last_n_years(sales_row)}
-- Net Profit: {last_n_years(net_profit_row)}
+- Sales: {last_n_years(pl, "sales")}
+- Net Profit: {last_n_years(pl, "net_profit")}
 
 💸 Cash Flow (last 5 years):
-- CFO: {last_n_years(cfo_row)}
-- Net Profit vs CFO Divergence: check if pattern diverges
+- CFO: {last_n_years(cf, "cfo")}
 
 🧮 Balance Sheet (latest year only):
 - Total Assets: {total_assets}
@@ -226,5 +571,16 @@ def build_summary_input(pl_df, cf_df, bs_df, sh_df) -> str:
 🧾 Shareholding Pattern (latest):
 - Promoter Holding: {promoter_holding}
 - FII Holding: {fii_holding}
-"""
 
+📐 Precomputed Metrics (latest year; growth/margins in %):
+- Sales CAGR 3y / 5y: {_pct("sales_cagr_3y")} / {_pct("sales_cagr_5y")}
+- Net Profit CAGR 3y / 5y: {_pct("profit_cagr_3y")} / {_pct("profit_cagr_5y")}
+- Net Margin latest / 5y avg: {_level("net_margin")} / {_level("net_margin_5y_avg")}
+- Operating Margin: {_level("operating_margin")}
+- CFO / Net Profit latest / 5y cumulative: {_x("cfo_pat")} / {_x("cfo_pat_5y")}
+- Receivables growth minus Sales growth: {_pp("receivables_growth_vs_sales")}
+- Inventory growth minus Sales growth: {_pp("inventory_growth_vs_sales")}
+- Debt / Equity latest / prior year: {_x("debt_equity")} / {_x("debt_equity_prev")}
+- Borrowings change YoY: {_pct("borrowings_change")}
+- Promoter holding change 1y / 2y: {_pp("promoter_change_1y")} / {_pp("promoter_change_2y")}
+"""
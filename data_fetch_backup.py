@@ -1,74 +1,85 @@
+import logging
+
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 
+from http_client import get_client
+from tracing import span
+
+log = logging.getLogger(__name__)
+
+
 def get_profit_loss_df(ticker: str) -> pd.DataFrame:
-    print(f"📥 Fetching Profit & Loss data for {ticker}...")
     url = f"https://www.screener.in/company/{ticker}/consolidated/"
     headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        soup = BeautifulSoup(requests.get(url, headers=headers).text, "lxml")
-        table = soup.find("section", id="profit-loss").find("table")
-        headers = [th.text.strip() for th in table.select("thead tr th")]
-        rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
-        df = pd.DataFrame(rows, columns=headers)
-        df.columns = ["Line Item"] + list(df.columns[1:])
-        print("✅ Profit & Loss data fetched successfully.")
-        return df
-    except Exception as e:
-        print(f"❌ Error fetching P&L: {e}")
-        return pd.DataFrame()
+    with span("statement", ticker=ticker, section="profit-loss") as s:
+        try:
+            soup = BeautifulSoup(get_client().get(url, headers=headers).text, "lxml")
+            table = soup.find("section", id="profit-loss").find("table")
+            headers = [th.text.strip() for th in table.select("thead tr th")]
+            rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
+            df = pd.DataFrame(rows, columns=headers)
+            df.columns = ["Line Item"] + list(df.columns[1:])
+            s.set(rows=len(df))
+            return df
+        except Exception as e:
+            s.fail(e)
+            log.warning("Could not get P&L for %s: %s", ticker, e)
+            return pd.DataFrame()
 
 def get_cashflow_df(ticker: str) -> pd.DataFrame:
-    print(f"📥 Fetching Cash Flow data for {ticker}...")
     url = f"https://www.screener.in/company/{ticker}/consolidated/"
     headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        soup = BeautifulSoup(requests.get(url, headers=headers).text, "lxml")
-        table = soup.find("section", id="cash-flow").find("table")
-        headers = [th.text.strip() for th in table.select("thead tr th")]
-        rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
-        df = pd.DataFrame(rows, columns=headers)
-        df.columns = ["Line Item"] + list(df.columns[1:])
-        print("✅ Cash Flow data fetched successfully.")
-        return df
-    except Exception as e:
-        print(f"❌ Error fetching Cash Flow: {e}")
-        return pd.DataFrame()
+    with span("statement", ticker=ticker, section="cash-flow") as s:
+        try:
+            soup = BeautifulSoup(get_client().get(url, headers=headers).text, "lxml")
+            table = soup.find("section", id="cash-flow").find("table")
+            headers = [th.text.strip() for th in table.select("thead tr th")]
+            rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
+            df = pd.DataFrame(rows, columns=headers)
+            df.columns = ["Line Item"] + list(df.columns[1:])
+            s.set(rows=len(df))
+            return df
+        except Exception as e:
+            s.fail(e)
+            log.warning("Could not get Cash Flow for %s: %s", ticker, e)
+            return pd.DataFrame()
 
 def get_balance_sheet_df(ticker: str) -> pd.DataFrame:
-    print(f"📥 Fetching Balance Sheet data for {ticker}...")
     url = f"https://www.screener.in/company/{ticker}/consolidated/"
     headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        soup = BeautifulSoup(requests.get(url, headers=headers).text, "lxml")
-        table = soup.find("section", id="balance-sheet").find("table")
-        headers = [th.text.strip() for th in table.select("thead tr th")]
-        rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
-        df = pd.DataFrame(rows, columns=headers)
-        df.columns = ["Line Item"] + list(df.columns[1:])
-        print("✅ Balance Sheet data fetched successfully.")
-        return df
-    except Exception as e:
-        print(f"❌ Error fetching Balance Sheet: {e}")
-        return pd.DataFrame()
+    with span("statement", ticker=ticker, section="balance-sheet") as s:
+        try:
+            soup = BeautifulSoup(get_client().get(url, headers=headers).text, "lxml")
+            table = soup.find("section", id="balance-sheet").find("table")
+            headers = [th.text.strip() for th in table.select("thead tr th")]
+            rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
+            df = pd.DataFrame(rows, columns=headers)
+            df.columns = ["Line Item"] + list(df.columns[1:])
+            s.set(rows=len(df))
+            return df
+        except Exception as e:
+            s.fail(e)
+            log.warning("Could not get Balance Sheet for %s: %s", ticker, e)
+            return pd.DataFrame()
 
 def get_shareholding_pattern(ticker: str) -> pd.DataFrame:
-    print(f"📥 Fetching Shareholding Pattern data for {ticker}...")
     url = f"https://www.screener.in/company/{ticker}/consolidated/"
     headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        soup = BeautifulSoup(requests.get(url, headers=headers).text, "lxml")
-        table = soup.find("section", id="shareholding").find("table")
-        headers = [th.text.strip() for th in table.select("thead tr th")]
-        rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
-        df = pd.DataFrame(rows, columns=headers)
-        df.columns = ["Category"] + list(df.columns[1:])
-        print("✅ Shareholding data fetched successfully.")
-        return df
-    except Exception as e:
-        print(f"❌ Error fetching Shareholding Pattern: {e}")
-        return pd.DataFrame()
+    with span("statement", ticker=ticker, section="shareholding") as s:
+        try:
+            soup = BeautifulSoup(get_client().get(url, headers=headers).text, "lxml")
+            table = soup.find("section", id="shareholding").find("table")
+            headers = [th.text.strip() for th in table.select("thead tr th")]
+            rows = [[td.text.strip() for td in row.find_all("td")] for row in table.select("tbody tr")]
+            df = pd.DataFrame(rows, columns=headers)
+            df.columns = ["Category"] + list(df.columns[1:])
+            s.set(rows=len(df))
+            return df
+        except Exception as e:
+            s.fail(e)
+            log.warning("Could not get Shareholding Pattern for %s: %s", ticker, e)
+            return pd.DataFrame()
 
 
 def build_summary_input(pl_df, cf_df, bs_df, sh_df) -> str:
@@ -143,7 +154,7 @@ def build_summary_input(pl_df, cf_df, bs_df, sh_df) -> str:
 
 def get_peer_companies(ticker: str, max_peers: int = 4):
     url = f"https://www.screener.in/company/{ticker}/peers/"
-    r = requests.get(url)
+    r = get_client().get(url)
     soup = BeautifulSoup(r.text, "html.parser")
     
     peer_links = soup.select("table tbody td a[href^='/company/']")
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import time
+
+
+# Record/replay of everything that leaves the machine, for offline and
+# repeatable runs:
+#
+#   FIXTURE_MODE=record  real requests; every Screener response and LLM
+#                        request/response pair is also saved to FIXTURE_DIR
+#   FIXTURE_MODE=replay  nothing goes out; responses come from FIXTURE_DIR,
+#                        and a request with no recording raises FixtureMissing
+#
+# The hooks sit behind the existing interfaces: http_client.get_client()
+# and llm_factory.get_chat_model() hand out the wrappers below, so fetch,
+# parse, prompt and cache code runs unchanged. The on-disk response and LLM
+# caches are bypassed in both modes, so recording sees every call and replay
+# exercises the full path. FIXTURE_LATENCY adds simulated latency on replay:
+# "recorded" sleeps for the time the original call took, a number sleeps
+# that many seconds per call.
+#
+# The ReAct agent's own reasoning calls go through LangChain's agent
+# executor, which needs a real chat model, so they are not recorded; the
+# analysis, planner and peer-comparison calls are.
+FIXTURE_MODE = os.getenv("FIXTURE_MODE", "").lower()
+FIXTURE_DIR = os.getenv("FIXTURE_DIR", "fixtures")
+FIXTURE_LATENCY = os.getenv("FIXTURE_LATENCY", "")
+FIXTURES_ACTIVE = FIXTURE_MODE in ("record", "replay")
+
+
+class FixtureMissing(LookupError):
+    pass
+
+
+def _key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:20]
+
+
+def _path(kind: str, key: str, ext: str = "json") -> str:
+    return os.path.join(FIXTURE_DIR, kind, f"{key}.{ext}")
+
+
+def _write(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str, what: str) -> dict:
+    if not os.path.exists(path):
+        raise FixtureMissing(f"No recorded {what} in {FIXTURE_DIR} (run once with FIXTURE_MODE=record)")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _simulate_latency(recorded: float):
+    if not FIXTURE_LATENCY or FIXTURE_LATENCY == "0":
+        return
+    time.sleep(recorded if FIXTURE_LATENCY == "recorded" else float(FIXTURE_LATENCY))
+
+
+# ---- HTTP ----
+
+class FixtureResponse:
+    # The parts of requests.Response that the fetch code reads.
+    def __init__(self, url: str, status_code: int, text: str, headers: dict):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} for {self.url} (fixture)", response=self)
+
+
+class FixtureHTTPClient:
+    # Same get() as http_client.FetchClient. Keyed by URL only.
+    def __init__(self, inner=None):
+        self.inner = inner
+
+    def get(self, url: str, headers: dict = None):
+        key = _key(url)
+        if FIXTURE_MODE == "replay":
+            meta = _read_json(_path("http", key), f"response for {url}")
+            with open(_path("http", key, "html"), encoding="utf-8") as f:
+                text = f.read()
+            _simulate_latency(meta["elapsed"])
+            return FixtureResponse(url, meta["status_code"], text, meta["headers"])
+
+        start = time.perf_counter()
+        resp = self.inner.get(url, headers=headers)
+        elapsed = time.perf_counter() - start
+        _write(_path("http", key, "html"), resp.text)
+        _write(_path("http", key), json.dumps({
+            "url": url,
+            "status_code": resp.status_code,
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() in ("content-type", "etag", "last-modified")},
+            "elapsed": round(elapsed, 4),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }, indent=1))
+        return resp
+
+
+def wrap_http_client(client):
+    return FixtureHTTPClient(client) if FIXTURES_ACTIVE else client
+
+
+# ---- LLM ----
+
+class FixtureMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class FixtureChatModel:
+    # Stands in for a LangChain chat model at the invoke() call sites.
+    # model_name/temperature are exposed so llm_cache keys stay the same.
+    def __init__(self, inner, model_name: str, temperature):
+        self.inner = inner
+        self.model_name = model_name
+        self.temperature = temperature
+
+    def _key(self, messages) -> str:
+        from llm_cache import cache_key
+        return cache_key(self.model_name, self.temperature, messages)
+
+    def invoke(self, messages, config=None, **kwargs):
+        key = self._key(messages)
+        if FIXTURE_MODE == "replay":
+            record = _read_json(_path("llm", key), f"LLM response for this prompt ({self.model_name})")
+            _simulate_latency(record["elapsed"])
+            _replay_tokens(record["response"], (config or {}).get("callbacks") or [])
+            return FixtureMessage(record["response"])
+
+        from llm_cache import _message_pairs
+
+        start = time.perf_counter()
+        response = self.inner.invoke(messages, config=config, **kwargs)
+        elapsed = time.perf_counter() - start
+        _write(_path("llm", key), json.dumps({
+            "model": self.model_name,
+            "temperature": self.temperature,
+            "messages": _message_pairs(messages),
+            "response": response.content,
+            "elapsed": round(elapsed, 4),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }, ensure_ascii=False, indent=1))
+        return response
+
+
+def _replay_tokens(text: str, callbacks: list):
+    # Feed the recorded answer to streaming handlers a word at a time.
+    if not callbacks:
+        return
+    for cb in callbacks:
+        if hasattr(cb, "on_llm_start"):
+            cb.on_llm_start({}, [])
+    for word in text.split(" "):
+        for cb in callbacks:
+            if hasattr(cb, "on_llm_new_token"):
+                cb.on_llm_new_token(word + " ")
+    for cb in callbacks:
+        if hasattr(cb, "on_llm_end"):
+            cb.on_llm_end(None)
+
+
+def wrap_chat_model(model, model_name: str, temperature):
+    if FIXTURES_ACTIVE:
+        return FixtureChatModel(model, model_name, temperature)
+    return model
@@ -1,28 +1,9 @@
-import os
-import numpy as np
-import pandas as pd
-import streamlit as st
-from dotenv import load_dotenv
-import numpy as np
+from llm_cache import cached_invoke
+from forensic_scores import prescreen
+from llm_factory import chat_messages
+from run_context import RunContext, current_run_context
 
 
-from data_fetch import (
-    get_profit_loss_df,
-    get_balance_sheet_df,
-    get_shareholding_pattern,
-    get_cashflow_df,
-    build_summary_input
-)
-
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-
-# ✅ Load environment variables
-load_dotenv()
-openai_api_key = os.getenv("OPENAI_API_KEY")
-
-# ✅ Initialize LangChain-compatible OpenAI client
-client = ChatOpenAI(model_name="gpt-4o-mini", openai_api_key=openai_api_key)
 
 
 # def build_summary_input(pl_df, cf_df, bs_df, sh_df) -> str:
@@ -95,34 +76,9 @@ client = ChatOpenAI(model_name="gpt-4o-mini", openai_api_key=openai_api_key)
 # """
 
 
-def run_forensic_analysis(ticker: str, client):
-    with st.status("⏳ Fetching financial data...", expanded=True) as status:
-        st.write(f"📥 Profit & Loss for {ticker}")
-        pl_df = get_profit_loss_df(ticker)
-
-        st.write(f"📥 Cashflow for {ticker}")
-        cf_df = get_cashflow_df(ticker)
-
-        st.write(f"📥 Balance Sheet for {ticker}")
-        bs_df = get_balance_sheet_df(ticker)
-
-        st.write(f"📥 Shareholding for {ticker}")
-        sh_df = get_shareholding_pattern(ticker)
-
-        status.update(label="✅ All data fetched", state="complete")
-
-    missing_data = []
-    if pl_df.empty: missing_data.append("Profit & Loss")
-    if cf_df.empty: missing_data.append("Cash Flow")
-    if bs_df.empty: missing_data.append("Balance Sheet")
-    if sh_df.empty: missing_data.append("Shareholding")
-
-    if missing_data:
-        st.warning(f"⚠️ Missing data: {', '.join(missing_data)}. Proceeding with available information.")    
-
-    summary = build_summary_input(pl_df, cf_df, bs_df, sh_df)
-
-    forensic_prompt = f"""
+def build_forensic_prompt(summary: str, scores: str = "") -> str:
+    # Prompt text only (no Streamlit calls), so the planner can reuse it.
+    return f"""
 You are a forensic accounting analyst AI.
 
 Given structured financial data below, identify signs of accounting fraud, manipulation, or financial red flags.
@@ -147,14 +103,50 @@ Return:
 
 Here is the financial data:
 {summary}
+{scores}
+
+Figures are in Rs Cr unless noted. The Metrics line and the forensic scores are exact; use them as given instead of recomputing ratios from the raw figures. Explain what the crossed thresholds mean for this company.
 
 If any critical data is missing, please let the user know, that data is missing. Please provide specifics of which data is missing.
 """
 
-    response = client.invoke([
-        SystemMessage(content="You are a financial analyst AI."),
-        HumanMessage(content=forensic_prompt)
-    ])
-    print(response.content)
+
+def run_forensic_analysis(ticker: str, client):
+    # Reuse whatever this agent run already fetched (see run_context.py).
+    ctx = current_run_context() or RunContext()
+    progress = ctx.progress
+    with progress.status("⏳ Fetching financial data...", expanded=True) as status:
+        if ctx.has_statements(ticker):
+            progress.write(f"♻️ Reusing financial data already fetched for {ticker}")
+        else:
+            progress.write(f"📥 Profit & Loss, Cashflow, Balance Sheet and Shareholding for {ticker}")
+        data = ctx.get_statements(ticker)
+        pl_df, cf_df = data["pnl"], data["cashflow"]
+        bs_df, sh_df = data["balance_sheet"], data["shareholding"]
+
+        status.update(label="✅ All data fetched", state="complete")
+
+    missing_data = []
+    if pl_df.empty: missing_data.append("Profit & Loss")
+    if cf_df.empty: missing_data.append("Cash Flow")
+    if bs_df.empty: missing_data.append("Balance Sheet")
+    if sh_df.empty: missing_data.append("Shareholding")
+
+    if missing_data:
+        progress.warning(f"⚠️ Missing data: {', '.join(missing_data)}. Proceeding with available information.")    
+
+    # Rule-based pre-screen; clean names skip the LLM audit entirely.
+    screen = prescreen(data, ticker)
+    if not screen.needs_audit:
+        progress.write(f"✅ {ticker} passed the forensic pre-screen, skipping the LLM audit")
+        return screen.clean_report()
+
+    summary = ctx.get_summary(ticker)
+
+    forensic_prompt = build_forensic_prompt(summary, screen.as_text())
+
+    response = cached_invoke(
+        client, chat_messages("You are a financial analyst AI.", forensic_prompt), config=ctx.llm_config()
+    )
     return response.content
 
@@ -0,0 +1,195 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from metrics import _div, _last_valid_index, _normalize, _panel, _take, _years
+
+
+# Classic forensic scores computed locally over a (ticker x fiscal year)
+# panel, the same way metrics.py does: Beneish M-score, Altman Z,
+# Piotroski F, Sloan accrual ratio and CFO/PAT. They gate the LLM audit:
+# only tickers that cross one of the thresholds below are sent to the model,
+# and the scores go into its prompt.
+#
+# Screener's statements are condensed, so a few inputs are proxies:
+# - gross margin -> operating margin (no COGS line);
+# - current assets/liabilities -> "Other Assets"/"Other Liabilities" when the
+#   page has no current-asset rows;
+# - Altman uses the private-firm Z' (book equity instead of market value);
+# - Beneish SGAI (no SG&A line) is neutral (1), as are DSRI, AQI, DEPI and
+#   LVGI when their rows are missing.
+BENEISH_THRESHOLD = float(os.getenv("BENEISH_THRESHOLD", "-1.78"))  # M above -> likely manipulator
+ALTMAN_Z_THRESHOLD = float(os.getenv("ALTMAN_Z_THRESHOLD", "1.23"))  # Z' below -> distress zone
+PIOTROSKI_THRESHOLD = int(os.getenv("PIOTROSKI_THRESHOLD", "3"))  # F at or below -> weak
+ACCRUAL_THRESHOLD = float(os.getenv("ACCRUAL_THRESHOLD", "0.10"))  # accruals / avg assets above
+CFO_PAT_THRESHOLD = float(os.getenv("CFO_PAT_THRESHOLD", "0.8"))  # 3y cumulative CFO/PAT below
+FORENSIC_GATE = os.getenv("FORENSIC_GATE", "1").lower() not in ("0", "false", "no")
+
+SCORE_NAMES = ("beneish_m", "altman_z", "piotroski_f", "accrual_ratio", "cfo_pat_3y")
+
+
+def _prev(a):
+    out = np.full_like(a, np.nan)
+    out[:, 1:] = a[:, :-1]
+    return out
+
+
+def _index(now, before, neutral=True):
+    # Year-over-year ratio index; 1 (no change) where inputs are missing.
+    out = _div(now, _prev(before))
+    return np.where(np.isnan(out), 1.0, out) if neutral else out
+
+
+def _or(a, b):
+    return np.where(np.isnan(a), b, a)
+
+
+def _avg_prev(a):
+    return np.where(np.isnan(_prev(a)), a, (a + _prev(a)) / 2)
+
+
+def _rolling_sum(a, n):
+    out = np.full_like(a, np.nan)
+    for j in range(n - 1, a.shape[1]):
+        out[:, j] = a[:, j - n + 1:j + 1].sum(axis=1)
+    return out
+
+
+def yearly_scores(statement_sets) -> dict:
+    # {score: DataFrame(ticker x fiscal year)}
+    sets = _normalize(statement_sets)
+    years = _years(sets)
+    tickers = [data.get("ticker") for data in sets]
+    p = lambda name, key: _panel(sets, name, key, years)
+
+    sales, net_profit = p("pnl", "sales"), p("pnl", "net_profit")
+    operating_profit, depreciation = p("pnl", "operating_profit"), p("pnl", "depreciation")
+    ebit = p("pnl", "pbt") + np.nan_to_num(p("pnl", "interest"))
+    cfo = p("cashflow", "cfo")
+    total_assets, fixed_assets = p("balance_sheet", "total_assets"), p("balance_sheet", "fixed_assets")
+    borrowings = np.nan_to_num(p("balance_sheet", "borrowings"))
+    other_liabilities = p("balance_sheet", "other_liabilities")
+    reserves, share_capital = p("balance_sheet", "reserves"), p("balance_sheet", "equity_capital")
+    receivables = p("balance_sheet", "receivables")
+    current_assets = _or(p("balance_sheet", "current_assets"), p("balance_sheet", "other_assets"))
+    current_liabilities = _or(p("balance_sheet", "current_liabilities"), other_liabilities)
+    total_liabilities = borrowings + np.nan_to_num(other_liabilities)
+
+    margin = _div(operating_profit, sales)
+    rec_to_sales = _div(receivables, sales)
+    soft_assets = 1 - _div(current_assets + np.nan_to_num(fixed_assets), total_assets)
+    dep_rate = _div(depreciation, depreciation + fixed_assets)
+    leverage = _div(total_liabilities, total_assets)
+
+    # Beneish M-score, 8-variable model.
+    dsri = _index(rec_to_sales, rec_to_sales)
+    gmi = _div(_prev(margin), margin)
+    aqi = _index(soft_assets, soft_assets)
+    sgi = _div(sales, _prev(sales))
+    depi = _div(_prev(dep_rate), dep_rate)
+    depi = np.where(np.isnan(depi), 1.0, depi)
+    lvgi = _index(leverage, leverage)
+    tata = _div(net_profit - cfo, total_assets)
+    sgai = 1.0
+    beneish = (-4.84 + 0.92 * dsri + 0.528 * gmi + 0.404 * aqi + 0.892 * sgi + 0.115 * depi
+               - 0.172 * sgai + 4.679 * tata - 0.327 * lvgi)
+
+    # Altman Z' (private firms, book equity).
+    equity = np.nan_to_num(share_capital) + reserves
+    altman = (0.717 * _div(current_assets - current_liabilities, total_assets)
+              + 0.847 * _div(reserves, total_assets)
+              + 3.107 * _div(ebit, total_assets)
+              + 0.420 * _div(equity, total_liabilities)
+              + 0.998 * _div(sales, total_assets))
+
+    # Piotroski F: nine binary signals; NaN without a prior year's assets.
+    roa = _div(net_profit, _prev(total_assets))
+    current_ratio = _div(current_assets, current_liabilities)
+    turnover = _div(sales, _prev(total_assets))
+    long_debt = _div(borrowings, total_assets)
+    signals = [
+        roa > 0,
+        cfo > 0,
+        roa > _prev(roa),
+        cfo > net_profit,
+        long_debt <= _prev(long_debt),
+        current_ratio > _prev(current_ratio),
+        share_capital <= _prev(share_capital),
+        margin > _prev(margin),
+        turnover > _prev(turnover),
+    ]
+    piotroski = np.where(np.isnan(roa), np.nan, np.sum(signals, axis=0))
+
+    scores = {
+        "beneish_m": beneish,
+        "altman_z": altman,
+        "piotroski_f": piotroski,
+        "accrual_ratio": _div(net_profit - cfo, _avg_prev(total_assets)),
+        "cfo_pat_3y": _div(_rolling_sum(cfo, 3), _rolling_sum(net_profit, 3)),
+    }
+    return {name: pd.DataFrame(values, index=tickers, columns=years) for name, values in scores.items()}
+
+
+def forensic_scores(statement_sets) -> pd.DataFrame:
+    # Latest available value of each score, one row per ticker.
+    yearly = yearly_scores(statement_sets)
+    out = pd.DataFrame(
+        {name: _take(df.to_numpy(), _last_valid_index(df.to_numpy())) for name, df in yearly.items()},
+        index=pd.Index(yearly["beneish_m"].index, name="ticker"),
+    )
+    flags = out.apply(score_flags, axis=1)
+    out["flags"] = flags
+    # Unscorable names are audited rather than waved through.
+    out["needs_audit"] = flags.map(bool) | out[list(SCORE_NAMES)].isna().all(axis=1)
+    return out
+
+
+def score_flags(scores) -> list:
+    flags = []
+    if scores["beneish_m"] > BENEISH_THRESHOLD:
+        flags.append(f"Beneish M {scores['beneish_m']:.2f} > {BENEISH_THRESHOLD}")
+    if scores["altman_z"] < ALTMAN_Z_THRESHOLD:
+        flags.append(f"Altman Z' {scores['altman_z']:.2f} < {ALTMAN_Z_THRESHOLD}")
+    if scores["piotroski_f"] <= PIOTROSKI_THRESHOLD:
+        flags.append(f"Piotroski F {scores['piotroski_f']:.0f} <= {PIOTROSKI_THRESHOLD}")
+    if scores["accrual_ratio"] > ACCRUAL_THRESHOLD:
+        flags.append(f"Accrual ratio {scores['accrual_ratio']:.2f} > {ACCRUAL_THRESHOLD}")
+    if scores["cfo_pat_3y"] < CFO_PAT_THRESHOLD:
+        flags.append(f"CFO/PAT 3y {scores['cfo_pat_3y']:.2f} < {CFO_PAT_THRESHOLD}")
+    return flags
+
+
+class Prescreen:
+    # Scores and gate decision for one ticker.
+    def __init__(self, ticker: str, row: pd.Series):
+        self.ticker = ticker
+        self.scores = {name: (None if pd.isna(row[name]) else float(row[name])) for name in SCORE_NAMES}
+        self.flags = list(row["flags"])
+        self.needs_audit = bool(row["needs_audit"]) or not FORENSIC_GATE
+
+    def as_text(self) -> str:
+        def fmt(name, spec):
+            value = self.scores[name]
+            return "-" if value is None else format(value, spec)
+
+        return (
+            f"Forensic scores (latest year): Beneish M={fmt('beneish_m', '.2f')}, "
+            f"Altman Z'={fmt('altman_z', '.2f')}, Piotroski F={fmt('piotroski_f', '.0f')}/9, "
+            f"Accrual ratio={fmt('accrual_ratio', '.2f')}, CFO/PAT 3y={fmt('cfo_pat_3y', '.2f')}\n"
+            f"Thresholds crossed: {'; '.join(self.flags) if self.flags else 'none'}"
+        )
+
+    def clean_report(self) -> str:
+        # Returned instead of an LLM audit when nothing crosses a threshold.
+        return (
+            f"✅ No Red Flags for {self.ticker} from the forensic pre-screen; the LLM audit was skipped.\n\n"
+            f"{self.as_text()}\n\n"
+            "These are rule-based scores on reported statements; they do not rule out issues the "
+            "statements do not show (related-party dealings, pledges, auditor remarks)."
+        )
+
+
+def prescreen(statements: dict, ticker: str = None) -> Prescreen:
+    ticker = ticker or statements.get("ticker")
+    return Prescreen(ticker, forensic_scores([dict(statements, ticker=ticker)]).iloc[0])
@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from fixtures import FIXTURES_ACTIVE
+
+
+# On-disk cache for Screener HTML. Entries are zlib-compressed and keyed by URL
+# (with the ticker stored alongside so one company can be purged on its own).
+# Stale entries are kept so they can be revalidated with ETag/Last-Modified.
+CACHE_DIR = os.getenv("SCREENER_CACHE_DIR", ".screener_cache")
+CACHE_TTL_SECONDS = int(os.getenv("SCREENER_CACHE_TTL", str(12 * 60 * 60)))
+CACHE_MAX_BYTES = int(os.getenv("SCREENER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_MAX_ENTRIES = int(os.getenv("SCREENER_CACHE_MAX_ENTRIES", "5000"))
+CACHE_DISABLED = os.getenv("SCREENER_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+class CachedResponse:
+    def __init__(self, url, ticker, text, etag, last_modified, fetched_at):
+        self.url = url
+        self.ticker = ticker
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = None,
+        ttl: float = CACHE_TTL_SECONDS,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_entries: int = CACHE_MAX_ENTRIES,
+    ):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "responses.sqlite")
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                ticker TEXT,
+                body BLOB,
+                size INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                accessed_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_ticker ON responses (ticker)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, url: str, ttl: float = None):
+        # Returns (entry, fresh). A stale entry is still returned so the caller
+        # can send a conditional request; None means nothing is cached.
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ticker, body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, False
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        ticker, body, etag, last_modified, fetched_at = row
+        entry = CachedResponse(url, ticker, zlib.decompress(body).decode("utf-8"), etag, last_modified, fetched_at)
+        fresh = entry.is_fresh(ttl)
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+        return entry, fresh
+
+    def put(self, url: str, ticker: str, text: str, etag: str = None, last_modified: str = None):
+        body = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, ticker, body, len(body), etag, last_modified, now, now),
+            )
+            self._conn.commit()
+            self._evict()
+
+    def touch(self, url: str):
+        # Server answered 304 Not Modified: the stored body is fresh again.
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+            self.revalidated += 1
+
+    def purge(self, ticker: str = None) -> int:
+        with self._lock:
+            if ticker is None:
+                cur = self._conn.execute("DELETE FROM responses")
+            else:
+                cur = self._conn.execute("DELETE FROM responses WHERE ticker = ?", (ticker,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def items(self):
+        # (url, ticker, html) for every stored page, fresh or stale.
+        with self._lock:
+            rows = self._conn.execute("SELECT url, ticker, body FROM responses").fetchall()
+        for url, ticker, body in rows:
+            yield url, ticker, zlib.decompress(body).decode("utf-8")
+
+    def _evict(self):
+        # Least recently accessed entries go first until both limits hold.
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        victims = []
+        for url, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((url,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", victims)
+        self._conn.commit()
+        self.evictions += len(victims)
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.stale + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": count,
+                "bytes": total,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _cache
+    if CACHE_DISABLED or FIXTURES_ACTIVE:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
@@ -0,0 +1,118 @@
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fixtures import wrap_http_client
+from tracing import annotate
+
+
+# Shared HTTP client for the fetch layer: one pooled keep-alive session,
+# connect/read timeouts, jittered exponential backoff on 429/5xx and a
+# token bucket so bulk refreshes stay under Screener's rate limit.
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+CONNECT_TIMEOUT = float(os.getenv("SCREENER_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("SCREENER_READ_TIMEOUT", "20"))
+MAX_RETRIES = int(os.getenv("SCREENER_MAX_RETRIES", "4"))
+BACKOFF_BASE_SECONDS = float(os.getenv("SCREENER_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP_SECONDS = float(os.getenv("SCREENER_BACKOFF_CAP", "30"))
+RATE_PER_SECOND = float(os.getenv("SCREENER_RATE_PER_SECOND", "1.0"))
+RATE_BURST = int(os.getenv("SCREENER_RATE_BURST", "3"))
+POOL_SIZE = int(os.getenv("SCREENER_POOL_SIZE", "10"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMITED_HOSTS = ("screener.in",)
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Take a token now and sleep off any deficit outside the lock, so
+        # concurrent callers queue up at exactly `rate` requests per second.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class FetchClient:
+    def __init__(
+        self,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        rate_per_second: float = RATE_PER_SECOND,
+        burst: int = RATE_BURST,
+        pool_size: int = POOL_SIZE,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        # Retries are handled below (with jitter and Retry-After), not by urllib3.
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _is_rate_limited(self, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        return any(host == h or host.endswith("." + h) for h in RATE_LIMITED_HOSTS)
+
+    def _backoff(self, attempt: int, retry_after: str = None) -> float:
+        if retry_after:
+            try:
+                return min(BACKOFF_CAP_SECONDS, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter: uniform in [0, base * 2^attempt], capped.
+        return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def get(self, url: str, headers: dict = None) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            if self._is_rate_limited(url):
+                self.bucket.acquire()
+            try:
+                resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                annotate(retries=attempt + 1)
+                log.warning("Retrying %s after %s", url, type(e).__name__)
+                time.sleep(self._backoff(attempt))
+                continue
+            if resp.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                annotate(retries=attempt + 1)
+                log.warning("Retrying %s after HTTP %s", url, resp.status_code)
+                time.sleep(self._backoff(attempt, resp.headers.get("Retry-After")))
+                continue
+            return resp
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FetchClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = wrap_http_client(FetchClient())
+        return _client
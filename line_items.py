@@ -0,0 +1,82 @@
+import re
+
+
+# Screener label variants -> canonical line-item keys. Labels differ between
+# regular companies, banks/NBFCs and the expanded schedules ("Other Assets +"
+# -> "Trade receivables", ...), so every known spelling is listed here once
+# and compiled into a flat dict at import. Lookups are exact on the
+# normalised label, which keeps e.g. "cash" from matching
+# "Cash from Operating Activity".
+CANONICAL_LINE_ITEMS = {
+    # Profit & Loss
+    "sales": ("Sales", "Revenue", "Revenue from Operations", "Net Sales", "Total Revenue"),
+    "expenses": ("Expenses", "Total Expenses"),
+    "operating_profit": ("Operating Profit", "Financing Profit", "EBITDA"),
+    "opm": ("OPM %", "Financing Margin %", "OPM"),
+    "other_income": ("Other Income",),
+    "interest": ("Interest", "Finance Costs", "Interest Expense"),
+    "depreciation": ("Depreciation", "Depreciation and Amortisation"),
+    "pbt": ("Profit before tax", "PBT"),
+    "tax_rate": ("Tax %",),
+    "net_profit": ("Net Profit", "Profit after tax", "PAT", "Net Income"),
+    "eps": ("EPS in Rs", "EPS"),
+    "dividend_payout": ("Dividend Payout %", "Dividend Payout"),
+    # Balance Sheet
+    "equity_capital": ("Equity Capital", "Share Capital"),
+    "reserves": ("Reserves", "Reserves and Surplus", "Other Equity"),
+    "borrowings": ("Borrowings", "Borrowing", "Total Borrowings", "Total Debt"),
+    "deposits": ("Deposits",),
+    "other_liabilities": ("Other Liabilities",),
+    "total_liabilities": ("Total Liabilities", "Total Equity and Liabilities"),
+    "fixed_assets": ("Fixed Assets", "Net Block"),
+    "cwip": ("CWIP", "Capital Work in Progress"),
+    "investments": ("Investments",),
+    "other_assets": ("Other Assets",),
+    "total_assets": ("Total Assets",),
+    "receivables": ("Trade receivables", "Trade Receivables", "Debtors", "Sundry Debtors", "Receivables"),
+    "inventories": ("Inventories", "Inventory"),
+    "cash": ("Cash Equivalents", "Cash & Equivalents", "Cash and Cash Equivalents", "Cash and Bank", "Cash & Bank"),
+    "current_assets": ("Current Assets", "Total Current Assets"),
+    "current_liabilities": ("Current Liabilities", "Total Current Liabilities"),
+    # Cash Flow
+    "cfo": ("Cash from Operating Activity", "Cash Flow from Operations", "Cash from Operations",
+            "Cash Flow from Ops", "Net Cash from Operating Activities"),
+    "cfi": ("Cash from Investing Activity", "Net Cash from Investing Activities"),
+    "cff": ("Cash from Financing Activity", "Net Cash from Financing Activities"),
+    "net_cash_flow": ("Net Cash Flow",),
+    # Shareholding
+    "promoters": ("Promoters", "Promoter", "Promoter & Promoter Group"),
+    "fii": ("FIIs", "FII", "Foreign Institutions"),
+    "dii": ("DIIs", "DII", "Domestic Institutions"),
+    "government": ("Government",),
+    "public": ("Public",),
+    "shareholders": ("No. of Shareholders", "Number of Shareholders"),
+}
+
+_NORMALIZE_RE = re.compile(r"[\s\xa0]+")
+
+
+def normalize_label(label) -> str:
+    text = _NORMALIZE_RE.sub(" ", str(label)).strip().rstrip("+").strip()
+    return text.lower()
+
+
+ALIASES = {
+    normalize_label(variant): key
+    for key, variants in CANONICAL_LINE_ITEMS.items()
+    for variant in variants
+}
+
+
+def canonical_key(label):
+    return ALIASES.get(normalize_label(label))
+
+
+def build_line_item_index(labels) -> dict:
+    # {canonical_key: position} for one statement; the first matching row wins.
+    index = {}
+    for pos, label in enumerate(labels):
+        key = canonical_key(label)
+        if key is not None and key not in index:
+            index[key] = pos
+    return index
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from fixtures import FIXTURES_ACTIVE
+from http_cache import CACHE_DIR
+from tracing import span
+
+
+# Persistent cache for LLM completions, keyed by model, temperature and a hash
+# of the normalised prompt. Sits in front of every client.invoke()/llm(...)
+# call site so a byte-identical analysis is served from disk instead of
+# paying model latency and tokens again.
+#
+# LLM_DETERMINISTIC=1 pins temperatures to 0 (see llm_temperature), which is
+# what makes repeated prompts produce - and therefore cache - the same answer.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm.sqlite"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+LLM_DETERMINISTIC = os.getenv("LLM_DETERMINISTIC", "").lower() in ("1", "true", "yes")
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def llm_temperature(default: float = None) -> float:
+    # default=None stands for the client library's own default, which
+    # deterministic mode pins like any other.
+    return 0.0 if LLM_DETERMINISTIC else default
+
+
+def normalize_prompt(text: str) -> str:
+    text = _TRAILING_SPACE_RE.sub("\n", str(text).replace("\r\n", "\n"))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def _message_pairs(messages) -> list:
+    # LangChain messages or OpenAI-style dicts -> [(role, normalised content)]
+    pairs = []
+    for m in messages:
+        if isinstance(m, dict):
+            role, content = m.get("role"), m.get("content")
+        else:
+            role, content = getattr(m, "type", type(m).__name__), getattr(m, "content", m)
+        pairs.append((role, normalize_prompt(content)))
+    return pairs
+
+
+def cache_key(model: str, temperature, messages) -> str:
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": _message_pairs(messages)},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedMessage:
+    # Stand-in for the AIMessage a chat model returns; call sites only read .content.
+    def __init__(self, content: str):
+        self.content = content
+        self.from_cache = True
+
+
+class LLMCache:
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                temperature REAL,
+                response TEXT,
+                created_at REAL,
+                accessed_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed ON completions (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] >= self.ttl:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expired += 1
+                return None
+            self._conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, temperature, response: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, temperature, response, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            if count > self.max_entries:
+                # Least recently used entries go first.
+                cur = self._conn.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self.evictions += cur.rowcount
+            self._conn.commit()
+
+    def clear(self) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            lookups = self.hits + self.misses + self.expired
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": entries,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    global _cache
+    if LLM_CACHE_DISABLED or FIXTURES_ACTIVE:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def _prompt_size(model: str, messages):
+    # Prompt size as its own stage: token counting is not free on long prompts.
+    from summary_format import count_tokens
+
+    with span("prompt.size", model=model) as s:
+        text = "\n".join(content for _, content in _message_pairs(messages))
+        tokens = count_tokens(text)
+        s.set(messages=len(messages), chars=len(text), tokens=tokens)
+    return tokens
+
+
+def cached_call(model: str, temperature, messages, call) -> str:
+    # call() performs the real request and returns the response text.
+    prompt_tokens = _prompt_size(model, messages)
+    with span("llm.call", model=model, prompt_tokens=prompt_tokens) as s:
+        cache = get_llm_cache()
+        if cache is None:
+            s.set(cache="off")
+            response = call()
+        else:
+            key = cache_key(model, temperature, messages)
+            hit = cache.get(key)
+            s.set(cache="hit" if hit is not None else "miss")
+            if hit is not None:
+                return hit
+            response = call()
+            cache.put(key, model, temperature, response)
+        s.set(completion_chars=len(response))
+        return response
+
+
+def _model_settings(client):
+    model = getattr(client, "model_name", None) or getattr(client, "model", None) or type(client).__name__
+    return model, getattr(client, "temperature", None)
+
+
+def cached_invoke(client, messages, **kwargs):
+    # Drop-in for client.invoke(messages) on LangChain chat models. Keying,
+    # spans and cache writes are cached_call's; a miss hands back the
+    # client's own message, a hit a CachedMessage.
+    model, temperature = _model_settings(client)
+    invoked = []
+
+    def call():
+        invoked.append(client.invoke(messages, **kwargs))
+        return invoked[0].content
+
+    content = cached_call(model, temperature, messages, call)
+    return invoked[0] if invoked else CachedMessage(content)
@@ -0,0 +1,61 @@
+import os
+import threading
+
+from fixtures import FIXTURE_MODE, FIXTURES_ACTIVE, wrap_chat_model
+from llm_cache import llm_temperature
+
+
+# One place that builds LLM clients, on first use rather than at import.
+# Importing langchain/openai is the bulk of the app's startup time, so those
+# imports live inside the functions below; modules that used to call
+# load_dotenv() and construct a ChatOpenAI at import now ask here when they
+# actually make a call. Clients are cached per settings, so every caller
+# asking for the same model shares one instance (and its connection pool).
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+_clients = {}
+_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env():
+    # load_dotenv() once per process.
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def openai_api_key():
+    load_env()
+    return os.getenv("OPENAI_API_KEY")
+
+
+def get_chat_model(model: str = DEFAULT_MODEL, temperature: float = None, streaming: bool = False,
+                   api_key: str = None, fixtures: bool = True):
+    # Shared LangChain ChatOpenAI. temperature=None keeps the library default
+    # (what the old module-level clients used); LLM_DETERMINISTIC pins it to
+    # 0 like any explicit temperature. Under FIXTURE_MODE the model is
+    # wrapped for record/replay (see fixtures.py) unless fixtures=False,
+    # which the agent executor needs since it requires a real chat model.
+    api_key = api_key or openai_api_key()
+    use_fixtures = fixtures and FIXTURES_ACTIVE
+    key = ("chat", model, temperature, streaming, api_key, use_fixtures)
+    with _lock:
+        if key not in _clients:
+            settled = llm_temperature(temperature)
+            chat = None
+            if FIXTURE_MODE != "replay" or not use_fixtures:
+                from langchain.chat_models import ChatOpenAI
+                kwargs = {"model_name": model, "streaming": streaming, "openai_api_key": api_key}
+                if settled is not None:
+                    kwargs["temperature"] = settled
+                chat = ChatOpenAI(**kwargs)
+            _clients[key] = wrap_chat_model(chat, model, settled) if use_fixtures else chat
+        return _clients[key]
+
+
+def chat_messages(system: str, user: str) -> list:
+    from langchain.schema import HumanMessage, SystemMessage
+    return [SystemMessage(content=system), HumanMessage(content=user)]
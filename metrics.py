@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+from statements import TTM_LABEL, as_statement
+
+
+# Financial metrics computed with NumPy over a (ticker x fiscal year) panel,
+# so one call covers every year of every ticker passed in. Input is a list of
+# statement sets as returned by data_fetch.get_all_statements() /
+# get_numeric_statements(): {"ticker", "pnl", "cashflow", "balance_sheet",
+# "shareholding"}. Ratios are plain numbers, growth rates and margins are in
+# percent, and holding changes are in percentage points.
+STATEMENT_NAMES = ("pnl", "cashflow", "balance_sheet", "shareholding")
+PROMOTER_QUARTERS = 9  # latest quarter plus two years of history
+
+
+def _normalize(statement_sets):
+    sets = []
+    for data in statement_sets:
+        data = dict(data)
+        for name in STATEMENT_NAMES:
+            data[name] = as_statement(data.get(name))
+        sets.append(data)
+    return sets
+
+
+def _years(sets):
+    years = set()
+    for data in sets:
+        for name in ("pnl", "cashflow", "balance_sheet"):
+            fiscal_years = data[name].fiscal_years
+            years.update(fiscal_years[fiscal_years >= 0].tolist())
+    return np.array(sorted(years), dtype=int)
+
+
+def _panel(sets, name, key, years):
+    # Each ticker's year-end values dropped into their fiscal-year columns
+    # (TTM and interim columns have fiscal year -1 and are left out);
+    # missing cells stay NaN.
+    out = np.full((len(sets), len(years)), np.nan)
+    for t, data in enumerate(sets):
+        stmt = data[name]
+        row = stmt.array(key)
+        if row is None:
+            continue
+        fiscal_years = stmt.fiscal_years
+        ok = (fiscal_years >= 0) & ~np.isnan(row)
+        out[t, np.searchsorted(years, fiscal_years[ok])] = row[ok]
+    return out
+
+
+def _quarter_panel(sets, key, quarters=PROMOTER_QUARTERS):
+    # Right-aligned: the last column is every ticker's latest quarter.
+    out = np.full((len(sets), quarters), np.nan)
+    for t, data in enumerate(sets):
+        stmt = data["shareholding"]
+        row = stmt.array(key)
+        if row is None:
+            continue
+        values = row[stmt.values.columns != TTM_LABEL][-quarters:]
+        if len(values):
+            out[t, -len(values):] = values
+    return out
+
+
+def _div(a, b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = a / b
+    return np.where(np.isfinite(out), out, np.nan)
+
+
+def _yoy_pct(a):
+    out = np.full_like(a, np.nan)
+    out[:, 1:] = _div(a[:, 1:] - a[:, :-1], np.abs(a[:, :-1])) * 100
+    return out
+
+
+def _last_valid_index(a):
+    if a.shape[1] == 0:
+        return np.full(a.shape[0], -1)
+    valid = ~np.isnan(a)
+    idx = a.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    return np.where(valid.any(axis=1), idx, -1)
+
+
+def _take(a, idx, offset=0):
+    pos = idx - offset
+    ok = (idx >= 0) & (pos >= 0)
+    out = np.full(a.shape[0], np.nan)
+    rows = np.nonzero(ok)[0]
+    out[rows] = a[rows, pos[rows]]
+    return out
+
+
+def _latest(a):
+    return _take(a, _last_valid_index(a))
+
+
+def _cagr(a, years):
+    idx = _last_valid_index(a)
+    end, start = _take(a, idx), _take(a, idx, years)
+    ok = (end > 0) & (start > 0)
+    out = np.full(a.shape[0], np.nan)
+    out[ok] = ((end[ok] / start[ok]) ** (1.0 / years) - 1) * 100
+    return out
+
+
+def _window_sum(a, idx, n):
+    # Sum of the n values ending at idx; NaN unless all n are present.
+    out = np.zeros(a.shape[0])
+    for offset in range(n):
+        out = out + _take(a, idx, offset)
+    return out
+
+
+def _nanmean_last(a, n):
+    window = a[:, -n:]
+    count = (~np.isnan(window)).sum(axis=1)
+    return _div(np.nansum(window, axis=1), np.where(count, count, np.nan))
+
+
+def _add_nan(a, b):
+    # a + b treating a missing side as 0, but NaN where both are missing.
+    return np.where(np.isnan(a) & np.isnan(b), np.nan, np.nan_to_num(a) + np.nan_to_num(b))
+
+
+def yearly_metrics(statement_sets) -> dict:
+    # {metric: DataFrame(ticker x fiscal year)}
+    sets = _normalize(statement_sets)
+    years = _years(sets)
+    tickers = [data.get("ticker") for data in sets]
+    p = lambda name, key: _panel(sets, name, key, years)
+
+    sales, net_profit = p("pnl", "sales"), p("pnl", "net_profit")
+    operating_profit = p("pnl", "operating_profit")
+    cfo = p("cashflow", "cfo")
+    borrowings = p("balance_sheet", "borrowings")
+    equity = _add_nan(p("balance_sheet", "equity_capital"), p("balance_sheet", "reserves"))
+    receivables, inventories = p("balance_sheet", "receivables"), p("balance_sheet", "inventories")
+    sales_growth = _yoy_pct(sales)
+
+    metrics = {
+        "sales": sales,
+        "net_profit": net_profit,
+        "cfo": cfo,
+        "borrowings": borrowings,
+        "equity": equity,
+        "sales_growth": sales_growth,
+        "profit_growth": _yoy_pct(net_profit),
+        "net_margin": _div(net_profit, sales) * 100,
+        "operating_margin": _div(operating_profit, sales) * 100,
+        "cfo_pat": _div(cfo, net_profit),
+        "receivables_growth_vs_sales": _yoy_pct(receivables) - sales_growth,
+        "inventory_growth_vs_sales": _yoy_pct(inventories) - sales_growth,
+        "debt_equity": _div(borrowings, equity),
+        "borrowings_change": _yoy_pct(borrowings),
+        "current_ratio": _div(p("balance_sheet", "current_assets"), p("balance_sheet", "current_liabilities")),
+        "total_assets": p("balance_sheet", "total_assets"),
+    }
+    return {name: pd.DataFrame(values, index=tickers, columns=years) for name, values in metrics.items()}
+
+
+def summary_metrics(statement_sets, yearly: dict = None) -> pd.DataFrame:
+    # One row per ticker with the latest-year figures and multi-year trends.
+    sets = _normalize(statement_sets)
+    yearly = yearly or yearly_metrics(sets)
+    a = {name: df.to_numpy() for name, df in yearly.items()}
+
+    anchor = _last_valid_index(a["sales"])
+    promoters = _quarter_panel(sets, "promoters")
+    promoter_latest = promoters[:, -1]
+
+    cfo_end = _last_valid_index(a["cfo"])
+    years = yearly["sales"].columns.to_numpy(dtype=float)
+    latest_year = _take(years[np.newaxis, :].repeat(len(sets), axis=0), anchor)
+
+    out = pd.DataFrame(
+        {
+            "latest_year": latest_year,
+            "sales_cagr_3y": _cagr(a["sales"], 3),
+            "sales_cagr_5y": _cagr(a["sales"], 5),
+            "profit_cagr_3y": _cagr(a["net_profit"], 3),
+            "profit_cagr_5y": _cagr(a["net_profit"], 5),
+            "net_margin": _latest(a["net_margin"]),
+            "net_margin_5y_avg": _nanmean_last(a["net_margin"], 5),
+            "operating_margin": _latest(a["operating_margin"]),
+            "cfo_pat": _latest(a["cfo_pat"]),
+            "cfo_pat_5y": _div(_window_sum(a["cfo"], cfo_end, 5), _window_sum(a["net_profit"], cfo_end, 5)),
+            "receivables_growth_vs_sales": _latest(a["receivables_growth_vs_sales"]),
+            "inventory_growth_vs_sales": _latest(a["inventory_growth_vs_sales"]),
+            "debt_equity": _latest(a["debt_equity"]),
+            "debt_equity_prev": _take(a["debt_equity"], _last_valid_index(a["debt_equity"]), 1),
+            "borrowings_change": _latest(a["borrowings_change"]),
+            "current_ratio": _latest(a["current_ratio"]),
+            "promoter_holding": promoter_latest,
+            "promoter_change_1y": promoter_latest - promoters[:, -5],
+            "promoter_change_2y": promoter_latest - promoters[:, 0],
+        },
+        index=pd.Index([data.get("ticker") for data in sets], name="ticker"),
+    )
+    return out
+
+
+def compute_metrics(statements: dict) -> dict:
+    # Single-ticker convenience: {metric: float}.
+    row = summary_metrics([statements]).iloc[0]
+    return {name: (None if pd.isna(value) else float(value)) for name, value in row.items()}
@@ -0,0 +1,69 @@
+import re
+
+import pandas as pd
+from lxml import html as lxml_html
+
+
+# Fast path for pulling statement tables out of a Screener company page.
+# Instead of building a DOM for the whole ~0.5 MB page, scan the raw HTML for
+# the wanted <section id=...> blocks, stop as soon as they have all been seen,
+# and hand only those fragments to lxml.
+STATEMENT_SECTIONS = ("profit-loss", "cash-flow", "balance-sheet", "shareholding")
+
+_SECTION_OPEN_RE = re.compile(r"<section\b[^>]*?\bid=[\"']([^\"']+)[\"'][^>]*>", re.I)
+_SECTION_TAG_RE = re.compile(r"<(/?)section\b", re.I)
+
+
+def find_section_ids(html: str) -> list:
+    return _SECTION_OPEN_RE.findall(html)
+
+
+def _section_end(html: str, start: int) -> int:
+    # Index just past the </section> matching the one opened at `start`,
+    # counting nested sections so an inner close tag does not end it early.
+    depth = 0
+    for m in _SECTION_TAG_RE.finditer(html, start):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            close = html.find(">", m.end())
+            return len(html) if close == -1 else close + 1
+    return len(html)
+
+
+def slice_sections(html: str, section_ids=STATEMENT_SECTIONS) -> dict:
+    wanted = set(section_ids)
+    fragments = {}
+    for m in _SECTION_OPEN_RE.finditer(html):
+        section_id = m.group(1)
+        if section_id in wanted and section_id not in fragments:
+            fragments[section_id] = html[m.start():_section_end(html, m.start())]
+            if len(fragments) == len(wanted):
+                break
+    return fragments
+
+
+def _text(el) -> str:
+    return el.text_content().strip()
+
+
+def fragment_to_df(fragment: str, first_col: str = "Line Item") -> pd.DataFrame:
+    root = lxml_html.fragment_fromstring(fragment, create_parent="div")
+    tables = root.xpath(".//table")
+    if not tables:
+        raise ValueError("No table found in section.")
+    table = tables[0]
+    headers = [_text(th) for th in table.xpath("./thead/tr/th")]
+    rows = [[_text(td) for td in tr.xpath("./td")] for tr in table.xpath("./tbody/tr")]
+    df = pd.DataFrame(rows, columns=headers)
+    if first_col not in df.columns:
+        df.columns = [first_col] + list(df.columns[1:])
+    return df
+
+
+def extract_tables(html: str, section_ids=STATEMENT_SECTIONS, first_cols: dict = None) -> dict:
+    # {section_id: DataFrame} for every requested section found on the page.
+    first_cols = first_cols or {"shareholding": "Category"}
+    return {
+        section_id: fragment_to_df(fragment, first_cols.get(section_id, "Line Item"))
+        for section_id, fragment in slice_sections(html, section_ids).items()
+    }
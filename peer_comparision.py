@@ -1,6 +1,12 @@
-import requests
-from bs4 import BeautifulSoup
-import numpy as np
+import logging
+import os
+
+from data_fetch import empty_statements, fetch_many_sync
+from llm_cache import cached_call, cached_invoke
+from llm_factory import chat_messages, get_chat_model
+from peer_index import get_peers
+from summary_format import budgeted_summary
+from tracing import annotate, span
 
 
 from data_fetch_backup import (
@@ -23,23 +29,57 @@ def get_all_financial_data(ticker: str):
 
 
 
+# Each peer gets this long to download and parse; slower peers are dropped
+# from the comparison rather than holding it up.
+PEER_DEADLINE_SECONDS = float(os.getenv("PEER_DEADLINE_SECONDS", "20"))
+
+log = logging.getLogger(__name__)
+
+
+def collect_peer_data(ticker: str, peer_tickers, deadline: float = PEER_DEADLINE_SECONDS):
+    # Fetches the target and all peers concurrently (one page each).
+    # Returns (target_data, peer_data_list, skipped) where skipped maps each
+    # dropped peer to the reason.
+    results = fetch_many_sync([ticker] + [p for p in peer_tickers if p != ticker], timeout=deadline)
+
+    target = results.get(ticker)
+    if target is not None and target.ok:
+        target_data = target.data
+    else:
+        # No second, unbounded fetch: the comparison goes ahead with the
+        # target marked missing, within the same deadline as the peers.
+        error = str(target.error) if target else "no result"
+        log.warning("Could not fetch %s: %s", ticker, error)
+        annotate(target_error=error)
+        target_data = empty_statements(ticker, error=error)
+
+    peer_data_list, skipped = [], {}
+    for peer in peer_tickers:
+        result = results.get(peer)
+        if result is None or peer == ticker:
+            continue
+        if result.ok:
+            peer_data_list.append(result.data)
+        else:
+            skipped[peer] = str(result.error)
+            log.warning("Skipping peer %s: %s", peer, result.error)
+    return target_data, peer_data_list, skipped
+
+
+def skipped_note(skipped: dict) -> str:
+    if not skipped:
+        return ""
+    return "Companies without data (no data within the deadline or fetch failed): " + ", ".join(skipped) + "\n"
+
+
 def summarize(data):
-    return build_summary_input(
-        data["pnl"], data["cashflow"], data["balance_sheet"], data["shareholding"]
-    )
+    # Compact, token-budgeted block; one per company in the prompt.
+    return budgeted_summary(data)
 
 def run_peer_comparison(ticker: str, client):
-    target_data = get_all_financial_data(ticker)
-    peer_tickers = get_peer_companies(ticker)
+    peer_tickers = get_peers(ticker, fallback=get_peer_companies)
+    target_data, peer_data_list, skipped = collect_peer_data(ticker, peer_tickers)
 
-    peer_data_list = []
-    for peer in peer_tickers:
-        try:
-            peer_data = get_all_financial_data(peer)
-            peer_data_list.append(peer_data)
-        except Exception as e:
-            print(f"Skipping {peer} due to error: {e}")
-    
     peer_summaries = "\n\n".join([f"{p['ticker']}:\n{summarize(p)}" for p in peer_data_list])
 
     comparison_prompt = f"""
@@ -49,29 +89,30 @@ Compare the financial health and metrics of the target company with its peers.
 
 Target: {ticker}
 Peers: {', '.join([p['ticker'] for p in peer_data_list])}
-
+{skipped_note(skipped)}
 🔹 Target Company Financials:
 {summarize(target_data)}
 
 🔸 Peer Company Financials:
 {peer_summaries}
 
+Figures are in Rs Cr unless noted; each company's Metrics line is exact.
+
 Give:
 - Relative strengths and weaknesses
 - Performance highlights
 - Final peer comparison verdict
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a financial comparison analyst AI."},
-            {"role": "user", "content": comparison_prompt}
-        ]
+    messages = [
+        {"role": "system", "content": "You are a financial comparison analyst AI."},
+        {"role": "user", "content": comparison_prompt}
+    ]
+    return cached_call(
+        "gpt-4o-mini", None, messages,
+        lambda: client.chat.completions.create(model="gpt-4o-mini", messages=messages).choices[0].message.content,
     )
 
-    return response.choices[0].message.content
-
 
 
 
@@ -80,10 +121,6 @@ Give:
 
 
 
-from langchain.chat_models import ChatOpenAI
-from langchain.schema import SystemMessage, HumanMessage
-from dotenv import load_dotenv
-import os
 import pandas as pd
 from typing import List
 
@@ -94,10 +131,8 @@ from data_fetch_backup import (
     get_shareholding_pattern
 )
 
-# Load environment variables
-load_dotenv()
-openai_api_key = os.getenv("OPENAI_API_KEY")
-llm = ChatOpenAI(model_name="gpt-4o", openai_api_key=openai_api_key)
+PEER_MODEL = "gpt-4o"
+PEER_TEMPERATURE = 0.7
 
 
 def get_peer_companies_via_gpt_lc(ticker: str) -> List[str]:
@@ -123,12 +158,8 @@ Output: TBZ, Kalyan Jewellers, PC Jeweller, Senco Gold
 Input Company: {ticker}
 """
 
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=user_prompt)
-    ]
-
-    response = llm(messages)
+    llm = get_chat_model(PEER_MODEL, temperature=PEER_TEMPERATURE)
+    response = cached_invoke(llm, chat_messages(system_prompt, user_prompt))
     peers_text = response.content.strip()
     return [peer.strip() for peer in peers_text.split(",") if peer.strip()]
 
@@ -209,40 +240,31 @@ def get_all_financial_data(ticker: str):
 
 
 def summarize(data):
-    return build_summary_input(
-        data["pnl"], data["cashflow"], data["balance_sheet"], data["shareholding"]
-    )
-
-
-def run_peer_comparison(ticker: str):
-    target_data = get_all_financial_data(ticker)
-    peer_tickers = get_peer_companies_via_gpt_lc(ticker)
+    # Compact, token-budgeted block; one per company in the prompt.
+    return budgeted_summary(data)
 
-    peer_data_list = []
-    for peer in peer_tickers:
-        try:
-            print(f"🔄 Fetching data for peer: {peer}")
-            peer_data = get_all_financial_data(peer)
-            peer_data_list.append(peer_data)
-        except Exception as e:
-            print(f"❌ Skipping {peer} due to error: {e}")
 
+def build_comparison_prompt(ticker: str, target_data, peer_data_list, skipped) -> str:
     peer_summaries = "\n\n".join([f"{p['ticker']}:\n{summarize(p)}" for p in peer_data_list])
+    if target_data.get("error"):
+        skipped = dict(skipped, **{ticker: target_data["error"]})
 
-    comparison_prompt = f"""
+    return f"""
 You are a financial comparison analyst AI.
 
 Compare the financial health of the target company with its industry peers. Analyze each across profitability, cash flow quality, balance sheet strength, and promoter confidence.
 
 Target: {ticker}
 Peers: {', '.join([p['ticker'] for p in peer_data_list])}
-
+{skipped_note(skipped)}
 🔹 Target Company Financials:
 {summarize(target_data)}
 
 🔸 Peer Company Financials:
 {peer_summaries}
 
+Figures are in Rs Cr unless noted; each company's Metrics line is exact.
+
 Return the following:
 1. 📊 Strength and weakness comparison
 2. 📈 Highlight which company has best profitability, CFO trend, leverage, and promoter confidence
@@ -250,10 +272,22 @@ Return the following:
 4. 🏆 Final verdict: Best positioned peer
 """
 
-    response = llm([
-        SystemMessage(content="You are a financial comparison analyst AI."),
-        HumanMessage(content=comparison_prompt)
-    ])
+
+def run_peer_comparison(ticker: str, peer_tickers: List[str] = None, client=None):
+    # peer_tickers/client default to the peer index and the shared gpt-4o
+    # model; benchmarks pass a fixed peer set and a stub.
+    if peer_tickers is None:
+        # Peers come from the local Screener peer index; the model is only asked
+        # for tickers the index cannot resolve.
+        peer_tickers = get_peers(ticker, fallback=get_peer_companies_via_gpt_lc)
+    with span("agent.step", tool="Peer Comparison", ticker=ticker, peers=", ".join(peer_tickers)) as s:
+        target_data, peer_data_list, skipped = collect_peer_data(ticker, peer_tickers)
+        s.set(compared=len(peer_data_list), skipped=len(skipped))
+
+        comparison_prompt = build_comparison_prompt(ticker, target_data, peer_data_list, skipped)
+
+        llm = client or get_chat_model(PEER_MODEL, temperature=PEER_TEMPERATURE)
+        response = cached_invoke(llm, chat_messages("You are a financial comparison analyst AI.", comparison_prompt))
 
     return response.content
 
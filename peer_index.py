@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from lxml import html as lxml_html
+
+from data_fetch import get_company_page
+from http_cache import CACHE_DIR
+from http_client import get_client
+from page_parser import slice_sections
+from run_context import normalize_ticker
+from tracing import annotate
+
+
+# Peer lists resolved from Screener's own data and kept on disk, so a peer
+# comparison is an in-memory lookup instead of a model call. For each ticker
+# the company page gives its industry classification and the id used by the
+# peers table endpoint; the peers' Screener slugs come from that table. The
+# LLM is only a fallback for tickers the index cannot resolve.
+PEER_INDEX_PATH = os.getenv("PEER_INDEX_PATH", os.path.join(CACHE_DIR, "peer_index.json"))
+PEER_INDEX_TTL_SECONDS = int(os.getenv("PEER_INDEX_TTL", str(30 * 24 * 60 * 60)))
+PEERS_API_URL = "https://www.screener.in/api/company/{warehouse_id}/peers/"
+MAX_PEERS = 5
+
+log = logging.getLogger(__name__)
+
+_WAREHOUSE_ID_RE = re.compile(r'data-warehouse-id="(\d+)"')
+_COMPANY_HREF_RE = re.compile(r"^/company/([^/]+)/")
+
+
+def _company_slugs(fragment: str) -> list:
+    root = lxml_html.fragment_fromstring(fragment, create_parent="div")
+    slugs = []
+    for href in root.xpath(".//a/@href"):
+        m = _COMPANY_HREF_RE.match(href)
+        if m and m.group(1).upper() not in slugs:
+            slugs.append(m.group(1).upper())
+    return slugs
+
+
+def _industry_path(page) -> str:
+    fragment = slice_sections(page.html, ["peers"]).get("peers")
+    if not fragment:
+        return ""
+    root = lxml_html.fragment_fromstring(fragment, create_parent="div")
+    links = root.xpath(".//a[starts-with(@href, '/market/')]/@href")
+    # The deepest /market/... link is the most specific classification.
+    return max(links, key=len) if links else ""
+
+
+class PeerIndex:
+    def __init__(self, path: str = PEER_INDEX_PATH, ttl: float = PEER_INDEX_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("Ignoring unreadable peer index %s: %s", path, e)
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def lookup(self, ticker: str):
+        # Fresh peer list from memory, or None. A fresh empty list is a hit
+        # too: Screener had no peers for the ticker, and asking it again
+        # before the TTL runs out would not change that.
+        entry = self.entries.get(normalize_ticker(ticker))
+        if entry is not None and time.time() - entry.get("updated_at", 0) < self.ttl:
+            return list(entry.get("peers") or [])
+        return None
+
+    def _same_industry(self, ticker: str, industry: str) -> list:
+        if not industry:
+            return []
+        return [t for t, e in self.entries.items() if t != ticker and e.get("industry") == industry]
+
+    def build(self, ticker: str) -> list:
+        # Resolve one ticker from Screener and persist the result.
+        ticker = normalize_ticker(ticker)
+        page = get_company_page(ticker)
+        industry = _industry_path(page)
+        peers = []
+        m = _WAREHOUSE_ID_RE.search(page.html)
+        if m:
+            resp = get_client().get(PEERS_API_URL.format(warehouse_id=m.group(1)))
+            if resp.status_code == 200:
+                peers = [p for p in _company_slugs(resp.text) if p != ticker]
+        if not peers:
+            peers = self._same_industry(ticker, industry)
+        with self._lock:
+            self.entries[ticker] = {"peers": peers, "industry": industry, "updated_at": time.time()}
+            self._save()
+        return peers
+
+    def get_peers(self, ticker: str, max_peers: int = MAX_PEERS, fallback=None) -> list:
+        peers = self.lookup(ticker)
+        if peers is None:
+            try:
+                peers = self.build(ticker)
+            except Exception as e:
+                log.warning("Could not build peer index entry for %s: %s", ticker, e)
+                peers = []
+        if not peers and fallback is not None:
+            log.info("%s not in peer index, asking the model", ticker)
+            annotate(peer_source="model")
+            peers = fallback(ticker)
+        return peers[:max_peers]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_peer_index() -> PeerIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PeerIndex()
+        return _index
+
+
+def get_peers(ticker: str, max_peers: int = MAX_PEERS, fallback=None) -> list:
+    return get_peer_index().get_peers(ticker, max_peers=max_peers, fallback=fallback)
@@ -0,0 +1,123 @@
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from Fundamental_analysis import build_analysis_prompt
+from forensic_audit import build_forensic_prompt
+from forensic_scores import prescreen
+from llm_cache import cached_invoke
+from llm_factory import DEFAULT_MODEL, chat_messages, get_chat_model
+from run_context import RunContext, normalize_ticker
+from tracing import in_context, span
+
+
+# Fast path for the standard questions. The ReAct agent spends a model round
+# trip deciding to call each tool and another to wrap up; for queries that
+# just ask for a health check and/or red flags the plan is always the same,
+# so it is run directly: one shared fetch, the Fundamental and Forensic
+# calls in parallel, and one synthesis call. Anything else goes to the agent.
+PLANNER_ENABLED = os.getenv("AGENT_PLANNER", "1").lower() not in ("0", "false", "no")
+
+FUNDAMENTAL = "Fundamental Analysis"
+FORENSIC = "Forensic Audit"
+
+_INTENTS = {
+    FUNDAMENTAL: re.compile(r"financial health|fundamental|health check|financials?\b|strength|analy[sz]", re.I),
+    FORENSIC: re.compile(r"red.?flags?|forensic|fraud|manipulat|accounting|audit", re.I),
+}
+# Anything that needs reasoning beyond the two reports.
+_FREE_FORM = re.compile(
+    r"\?|\b(compare|comparison|vs\.?|versus|peers?|why|how|when|what|which|should|price|valuation|target|"
+    r"dividend|buy|sell)\b",
+    re.I,
+)
+
+# Same shape as LangChain's AgentAction for the parts app.py reads.
+PlannedAction = namedtuple("PlannedAction", ["tool", "tool_input", "log"])
+
+SYNTHESIS_PROMPT = """
+The user asked: {query}
+
+Below are the reports produced for {ticker}. Combine them into one answer to the
+user's question: lead with the overall verdict, then the key strengths, the
+red flags (if any) and the scores given in the reports. Do not introduce
+figures that are not in the reports.
+
+{reports}
+"""
+
+
+def plan_query(query: str):
+    # The tools to run for a standard query, or None for the ReAct agent.
+    if not PLANNER_ENABLED or _FREE_FORM.search(query):
+        return None
+    tools = [name for name, pattern in _INTENTS.items() if pattern.search(query)]
+    return tools or None
+
+
+def missing_statements(data: dict) -> list:
+    names = {"pnl": "Profit & Loss", "cashflow": "Cash Flow", "balance_sheet": "Balance Sheet",
+             "shareholding": "Shareholding"}
+    return [label for key, label in names.items() if data[key].empty]
+
+
+def run_planned_analysis(ticker: str, query: str, tools: list, openai_api_key: str = None,
+                         callbacks=None, model: str = DEFAULT_MODEL, statements: dict = None,
+                         client=None, tool_callbacks: dict = None) -> dict:
+    # Returns the same keys as agent.invoke(): output and intermediate_steps,
+    # plus missing_data. callbacks see the call that produces the answer:
+    # the synthesis, or the only tool's analysis when the plan has one.
+    # tool_callbacks ({tool: [handlers]}) see each tool's analysis call; those
+    # run on pool threads, so handlers that draw into the page must attach
+    # themselves (streaming.StreamlitTokenHandler does). client overrides
+    # the chat model for every call (benchmarks pass a stub).
+    ticker = normalize_ticker(ticker)
+    with span("agent.run", ticker=ticker, planned=True, tools=", ".join(tools)):
+        ctx = RunContext(statements=statements)
+        data = ctx.get_statements(ticker)
+        summary = ctx.get_summary(ticker)
+
+        handlers = {tool: list((tool_callbacks or {}).get(tool, [])) for tool in tools}
+        if len(tools) == 1 and callbacks:
+            handlers[tools[0]] += callbacks
+        llm = client or get_chat_model(model, streaming=any(handlers.values()), api_key=openai_api_key)
+
+        screen = prescreen(data, ticker)
+
+        def analyse(tool):
+            with span("agent.step", tool=tool, ticker=ticker) as s:
+                if tool == FORENSIC:
+                    if not screen.needs_audit:
+                        s.set(skipped="prescreen clean")
+                        return screen.clean_report()
+                    prompt = build_forensic_prompt(summary, screen.as_text())
+                else:
+                    prompt = build_analysis_prompt(summary)
+                return cached_invoke(
+                    llm, chat_messages("You are a financial analyst AI.", prompt),
+                    config={"callbacks": handlers[tool]} if handlers[tool] else {},
+                ).content
+
+        with ThreadPoolExecutor(max_workers=len(tools)) as pool:
+            reports = list(pool.map(in_context(analyse), tools))
+
+        steps = [
+            (PlannedAction(tool, ticker, f"planned: {tool}"), report)
+            for tool, report in zip(tools, reports)
+        ]
+        if len(reports) == 1:
+            output = reports[0]
+        else:
+            synthesis = SYNTHESIS_PROMPT.format(
+                query=query,
+                ticker=ticker,
+                reports="\n\n".join(f"### {tool}\n{report}" for tool, report in zip(tools, reports)),
+            )
+            synth_llm = client or get_chat_model(model, temperature=0.9, streaming=bool(callbacks), api_key=openai_api_key)
+            with span("agent.step", tool="synthesis", ticker=ticker):
+                output = cached_invoke(
+                    synth_llm, chat_messages("You are a financial analyst AI.", synthesis),
+                    config={"callbacks": callbacks} if callbacks else {},
+                ).content
+    return {"output": output, "intermediate_steps": steps, "missing_data": missing_statements(data)}
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+
+
+# Where the analysis functions report what they are doing. Inside the app
+# that is the Streamlit page; in the batch CLI it is a plain callback, so the
+# analyses run without Streamlit (which is only imported by StreamlitProgress).
+# Each RunContext carries one; see run_context.py.
+
+
+class StreamlitProgress:
+    def status(self, label: str, expanded: bool = True):
+        import streamlit as st
+        return st.status(label, expanded=expanded)
+
+    def write(self, message: str):
+        import streamlit as st
+        st.write(message)
+
+    def warning(self, message: str):
+        import streamlit as st
+        st.warning(message)
+
+
+class _StatusHandle:
+    def __init__(self, progress):
+        self._progress = progress
+
+    def update(self, label: str = None, state: str = None, **kwargs):
+        if label:
+            self._progress.callback("status", label)
+
+
+class CallbackProgress:
+    # callback(kind, message) with kind one of "status", "info", "warning".
+    def __init__(self, callback=None):
+        self.callback = callback or print_progress
+
+    @contextmanager
+    def status(self, label: str, expanded: bool = True):
+        self.callback("status", label)
+        yield _StatusHandle(self)
+
+    def write(self, message: str):
+        self.callback("info", message)
+
+    def warning(self, message: str):
+        self.callback("warning", message)
+
+
+def print_progress(kind: str, message: str):
+    print(message)
+
+
+def silent_progress(kind: str, message: str):
+    pass
@@ -1,34 +1,55 @@
 # react_agent.py
-from langchain.agents import initialize_agent, AgentType
-from langchain.chat_models import ChatOpenAI
 from tools import get_tools
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
-from langchain.chat_models import ChatOpenAI 
-import numpy as np
-
-
-
-load_dotenv()
-openai_api_key = os.getenv("OPENAI_API_KEY")
-
-# ✅ Instantiate LangChain-compatible OpenAI model
-client = ChatOpenAI(model_name="gpt-4o-mini", openai_api_key=openai_api_key)
-
-
-def run_react_agent(ticker: str, query: str, openai_api_key: str) -> str:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.9, openai_api_key=openai_api_key)
-
-    tools = get_tools(llm)
-    agent = initialize_agent(
-        tools=tools,
-        llm=llm,
-        agent=AgentType.CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-        verbose=True,
-        handle_parsing_errors=True,
-        return_intermediate_steps=True  
-    )
-
-    # Provide ticker as input to the tool
-    return agent.invoke(query + f" The company ticker is {ticker}.")
+from run_context import RunContext, run_context
+from llm_factory import DEFAULT_MODEL, get_chat_model
+from tracing import span
+import threading
+
+
+# Agents are built once per (model, temperature, streaming, key) and shared
+# by every request and session. Nothing per-request lives on them: callbacks
+# are passed to invoke() and the tools read the run's data through the
+# RunContext ContextVar, so concurrent invocations don't interfere.
+_agents = {}
+_agents_lock = threading.Lock()
+
+
+def get_agent(model: str = DEFAULT_MODEL, temperature: float = 0.9, streaming: bool = False,
+              openai_api_key: str = None):
+    key = (model, temperature, streaming, openai_api_key)
+    with _agents_lock:
+        if key not in _agents:
+            from langchain.agents import initialize_agent, AgentType
+
+            # The executor needs the real model; the tools' calls can be
+            # recorded/replayed (see fixtures.py).
+            llm = get_chat_model(model, temperature=temperature, streaming=streaming, api_key=openai_api_key,
+                                 fixtures=False)
+            tool_llm = get_chat_model(model, temperature=temperature, streaming=streaming, api_key=openai_api_key)
+            _agents[key] = initialize_agent(
+                tools=get_tools(tool_llm),
+                llm=llm,
+                agent=AgentType.CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+                verbose=True,
+                handle_parsing_errors=True,
+                return_intermediate_steps=True
+            )
+        return _agents[key]
+
+
+def run_react_agent(ticker: str, query: str, openai_api_key: str, callbacks=None, tool_callbacks=None,
+                    agent=None, statements: dict = None) -> str:
+    # callbacks see the agent's own LLM calls (the final answer);
+    # tool_callbacks see the analysis calls made inside each tool.
+    # statements: {ticker: data} the caller already fetched.
+    streaming = bool(callbacks or tool_callbacks)
+    agent = agent or get_agent(streaming=streaming, openai_api_key=openai_api_key)
+
+    # Provide ticker as input to the tool. Both tools share one run context,
+    # so the ticker is fetched and summarised once per invocation.
+    with run_context(RunContext(callbacks=tool_callbacks, statements=statements)), \
+            span("agent.run", ticker=ticker, planned=False):
+        return agent.invoke(
+            query + f" The company ticker is {ticker}.",
+            config={"callbacks": callbacks} if callbacks else None,
+        )
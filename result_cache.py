@@ -0,0 +1,44 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# In-memory LRU for finished analyses, shared by every session of the app
+# (app.py holds one instance via st.cache_resource). Entries remember when
+# they were stored so the page can show "cached at". Keys are chosen by the
+# caller; app.py uses (ticker, query, data version, refresh nonce).
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("APP_ANALYSIS_CACHE_TTL", str(6 * 60 * 60)))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("APP_ANALYSIS_CACHE_MAX_ENTRIES", "256"))
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES, ttl: float = ANALYSIS_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        # (value, cached_at) or None.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, value) -> float:
+        cached_at = time.time()
+        with self._lock:
+            self._entries[key] = (value, cached_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached_at
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,78 @@
+import contextvars
+import re
+import threading
+from contextlib import contextmanager
+
+from data_fetch import build_summary_input, get_all_statements
+from progress import StreamlitProgress
+
+
+# Per-run memo shared by every tool the agent calls during one invocation:
+# each ticker's statements are fetched once and its summary is built once,
+# however many tools ask for them. The active context lives in a ContextVar,
+# so the tool functions find it without it being threaded through LangChain.
+_current = contextvars.ContextVar("run_context", default=None)
+
+
+def normalize_ticker(raw) -> str:
+    # Agents pass things like "GPIL", "'GPIL'" or "ticker: GPIL".
+    text = str(raw).strip().strip("'\"` ")
+    text = re.sub(r"^(ticker|company|symbol)\s*[:=]\s*", "", text, flags=re.I)
+    return text.strip().strip("'\"` ").upper()
+
+
+class RunContext:
+    def __init__(self, callbacks: list = None, progress=None, statements: dict = None):
+        # LangChain callback handlers for the tools' own LLM calls (e.g. token streaming).
+        self.callbacks = callbacks or []
+        # Where the tools report progress (see progress.py); the page by default.
+        self.progress = progress or StreamlitProgress()
+        self._lock = threading.Lock()
+        self._ticker_locks = {}
+        # Optional {ticker: get_all_statements() result} fetched by the caller.
+        self._statements = {normalize_ticker(t): data for t, data in (statements or {}).items()}
+        self._summaries = {}
+
+    def _ticker_lock(self, ticker):
+        with self._lock:
+            return self._ticker_locks.setdefault(ticker, threading.Lock())
+
+    def llm_config(self) -> dict:
+        return {"callbacks": self.callbacks} if self.callbacks else {}
+
+    def has_statements(self, ticker: str) -> bool:
+        return normalize_ticker(ticker) in self._statements
+
+    def get_statements(self, ticker: str) -> dict:
+        ticker = normalize_ticker(ticker)
+        with self._ticker_lock(ticker):
+            if ticker not in self._statements:
+                data = get_all_statements(ticker)
+                if data.get("error"):
+                    self.progress.warning(f"⚠️ Could not fetch data for {ticker}: {data['error']}")
+                self._statements[ticker] = data
+            return self._statements[ticker]
+
+    def get_summary(self, ticker: str) -> str:
+        ticker = normalize_ticker(ticker)
+        data = self.get_statements(ticker)
+        with self._ticker_lock(ticker):
+            if ticker not in self._summaries:
+                self._summaries[ticker] = build_summary_input(
+                    data["pnl"], data["cashflow"], data["balance_sheet"], data["shareholding"], ticker=ticker
+                )
+            return self._summaries[ticker]
+
+
+def current_run_context():
+    return _current.get()
+
+
+@contextmanager
+def run_context(ctx: RunContext = None):
+    ctx = ctx or RunContext()
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current.reset(token)
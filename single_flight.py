@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+# Request coalescing: while a call for a key is in flight, further calls
+# for the same key wait for it and share its result (or its exception)
+# instead of repeating the work. Used by the fetch layer so a burst of
+# requests for one ticker - several sessions, or tools running in parallel -
+# costs one download and one parse per section.
+#
+# do() is for threads; do_async() is for coroutines and never blocks the
+# event loop: the leader's work runs on an executor and everyone awaits the
+# shared future. Both kinds of caller can join the same flight. A key is
+# forgotten as soon as its flight finishes, so this is not a cache; callers
+# keep their own (and should re-check it inside fn, since a flight can end
+# between their cache miss and joining).
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def _join(self, key):
+        # (future, is_leader)
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = Future()
+            self.started += 1
+            return flight, True
+
+    def _settle(self, key, flight: Future, result=None, error: BaseException = None):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if flight.done():
+            return
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
+
+    def _run(self, key, flight: Future, fn):
+        try:
+            result = fn()
+        except BaseException as e:
+            self._settle(key, flight, error=e)
+        else:
+            self._settle(key, flight, result=result)
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key, fn):
+        flight, leader = self._join(key)
+        if leader:
+            self._run(key, flight, fn)
+        return flight.result()
+
+    async def do_async(self, key, fn, executor=None):
+        flight, leader = self._join(key)
+        if leader:
+            work = (executor or _default_executor()).submit(self._run, key, flight, fn)
+            # Work dropped before it started (its executor shut down) must
+            # still release the waiters.
+            work.add_done_callback(
+                lambda w: w.cancelled() and self._settle(
+                    key, flight, error=RuntimeError(f"single-flight call for {key!r} was abandoned")
+                )
+            )
+        # shield: a waiter timing out or being cancelled must not cancel the
+        # shared future under the others.
+        return await asyncio.shield(asyncio.wrap_future(flight))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"started": self.started, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="single-flight")
+        return _executor
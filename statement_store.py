@@ -0,0 +1,183 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_fetch import STATEMENT_KEYS, fetch_many_sync, get_all_statements, get_company_page
+from http_cache import CACHE_DIR
+from line_items import canonical_key
+from statements import NumericStatement, as_statement
+
+
+# Local store of parsed statements, one long-format row per cell:
+# (ticker, statement, fetched_at, line item, period) -> value + raw string.
+# Every ingest is kept as a snapshot keyed by fetch timestamp; the `current`
+# table points at the latest snapshot of each (ticker, statement) so reads of
+# the whole universe are a single indexed join.
+STORE_PATH = os.getenv("STATEMENT_STORE_PATH", os.path.join(CACHE_DIR, "statements.sqlite"))
+
+FIRST_COLS = {"pnl": "Line Item", "cashflow": "Line Item", "balance_sheet": "Line Item", "shareholding": "Category"}
+
+log = logging.getLogger(__name__)
+
+
+class StatementStore:
+    def __init__(self, path: str = STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Batch workers in separate processes share the file; wait out each
+        # other's write locks instead of failing.
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cells (
+                ticker TEXT, statement TEXT, fetched_at REAL,
+                row_pos INTEGER, raw_label TEXT, line_item TEXT, item_key TEXT,
+                period_pos INTEGER, period TEXT,
+                value REAL, raw TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_cells_snapshot ON cells (statement, ticker, fetched_at);
+            CREATE TABLE IF NOT EXISTS current (
+                ticker TEXT, statement TEXT, fetched_at REAL, latest_period TEXT,
+                PRIMARY KEY (ticker, statement)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def latest_period(self, ticker: str, statement: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latest_period FROM current WHERE ticker = ? AND statement = ?", (ticker, statement)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, ticker: str, statements: dict, fetched_at: float = None, only: set = None) -> list:
+        # Ingests a get_all_statements() set (getter frames also work);
+        # returns the names written.
+        fetched_at = fetched_at or time.time()
+        rows, current, written = [], [], []
+        for name in STATEMENT_KEYS:
+            if only is not None and name not in only:
+                continue
+            stmt = as_statement(statements.get(name), keep_raw=True)
+            if stmt.empty:
+                continue
+            values = stmt.values.to_numpy()
+            raw = stmt.raw.to_numpy() if stmt.raw is not None else None
+            periods = list(stmt.values.columns)
+            for row_pos, label in enumerate(stmt.values.index):
+                key = canonical_key(label)
+                unit = stmt.units.iloc[row_pos]
+                for period_pos, period in enumerate(periods):
+                    value = values[row_pos, period_pos]
+                    missing = np.isnan(value)
+                    if raw is not None:
+                        cell = raw[row_pos, period_pos]
+                    else:
+                        cell = "" if missing else f"{value:.12g}{unit}"
+                    rows.append((ticker, name, fetched_at, row_pos, label, label, key, period_pos, period,
+                                 None if missing else float(value), cell))
+            current.append((ticker, name, fetched_at, stmt.latest_period))
+            written.append(name)
+        with self._lock:
+            self._conn.executemany("INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany("INSERT OR REPLACE INTO current VALUES (?, ?, ?, ?)", current)
+            self._conn.commit()
+        return written
+
+    def load(self, ticker: str) -> dict:
+        # Latest snapshot rebuilt in the same shape as data_fetch.get_all_statements().
+        with self._lock:
+            df = pd.read_sql_query(
+                """
+                SELECT c.statement, c.row_pos, c.raw_label, c.period_pos, c.period, c.raw
+                FROM cells c JOIN current cur
+                  ON c.ticker = cur.ticker AND c.statement = cur.statement AND c.fetched_at = cur.fetched_at
+                WHERE c.ticker = ?
+                """,
+                self._conn,
+                params=(ticker,),
+            )
+        data = {"ticker": ticker}
+        for name, first_col in FIRST_COLS.items():
+            part = df[df["statement"] == name]
+            if part.empty:
+                data[name] = NumericStatement.from_frame(None)
+                continue
+            wide = part.pivot(index=["row_pos", "raw_label"], columns="period_pos", values="raw")
+            periods = part.drop_duplicates("period_pos").set_index("period_pos")["period"]
+            wide.columns = [periods[c] for c in wide.columns]
+            wide = wide.reset_index(level="raw_label").rename(columns={"raw_label": first_col})
+            wide.columns.name = None
+            data[name] = NumericStatement.from_frame(wide.reset_index(drop=True), keep_raw=True)
+        return data
+
+    def read_universe(self, statement: str = None, tickers=None) -> pd.DataFrame:
+        # Latest snapshot of every stored ticker as one long DataFrame.
+        query = """
+            SELECT c.ticker, c.statement, c.line_item, c.item_key, c.period, c.value, c.fetched_at
+            FROM cells c JOIN current cur
+              ON c.ticker = cur.ticker AND c.statement = cur.statement AND c.fetched_at = cur.fetched_at
+        """
+        clauses, params = [], []
+        if statement:
+            clauses.append("c.statement = ?")
+            params.append(statement)
+        if tickers:
+            tickers = list(tickers)
+            clauses.append(f"c.ticker IN ({', '.join('?' * len(tickers))})")
+            params.extend(tickers)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def _changed(self, ticker: str, statements: dict) -> set:
+        changed = set()
+        for name in STATEMENT_KEYS:
+            stmt = as_statement(statements.get(name))
+            if stmt.empty:
+                continue
+            if stmt.latest_period != self.latest_period(ticker, name):
+                changed.add(name)
+        return changed
+
+    def ingest(self, ticker: str, statements: dict, force: bool = False) -> list:
+        # Stores only the statements whose latest reported period moved
+        # (all of them with force); returns the names written.
+        changed = set(STATEMENT_KEYS) if force else self._changed(ticker, statements)
+        if not changed:
+            return []
+        log.info("Storing %s for %s", ", ".join(sorted(changed)), ticker)
+        return self.save(ticker, statements, only=changed)
+
+    def refresh(self, ticker: str, force: bool = False) -> list:
+        statements = get_all_statements(ticker, page=get_company_page(ticker, refresh=force), keep_raw=True)
+        return self.ingest(ticker, statements, force=force)
+
+    def refresh_many(self, tickers, force: bool = False, **fetch_kwargs) -> dict:
+        # {ticker: [statements written] or the fetch error}
+        results = {}
+        for ticker, result in fetch_many_sync(tickers, refresh=force, **fetch_kwargs).items():
+            results[ticker] = self.ingest(ticker, result.data, force=force) if result.ok else result.error
+        return results
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_statement_store() -> StatementStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = StatementStore()
+        return _store
@@ -0,0 +1,216 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from line_items import build_line_item_index
+
+
+# Numeric view of a Screener statement table. Cells like "1,234", "45.6%" or
+# "-" are parsed to float64 once, when the statement is built, so downstream
+# code never re-parses strings. Percent cells keep their percentage-point
+# value (45.6 for "45.6%") and the row is tagged with unit "%"; everything
+# else is in the page's own unit (Rs. Crores for the financial statements).
+TTM_LABEL = "TTM"
+MISSING_TOKENS = {"", "-", "--", "—", "N/A", "NA", "nan", "None"}
+
+_LABEL_SUFFIX_RE = re.compile(r"[\s\xa0]*\+$")
+_SPACES_RE = re.compile(r"[\s\xa0]+")
+
+
+def clean_label(label) -> str:
+    # "Sales\xa0+" -> "Sales"; the "+" is Screener's expand-row button.
+    return _SPACES_RE.sub(" ", _LABEL_SUFFIX_RE.sub("", str(label))).strip()
+
+
+def parse_cell(value):
+    # -> (float, is_percent)
+    text = str(value).replace(",", "").replace("\xa0", " ").strip()
+    if text in MISSING_TOKENS:
+        return np.nan, False
+    is_percent = text.endswith("%")
+    text = text.rstrip("%").strip()
+    try:
+        return float(text.split()[0]), is_percent
+    except (ValueError, IndexError):
+        return np.nan, is_percent
+
+
+def parse_period(label):
+    # "Mar 2015" -> 2015-03-31; TTM (and anything unparseable) -> NaT.
+    if str(label).strip().upper() == TTM_LABEL:
+        return pd.NaT
+    stamp = pd.to_datetime(str(label).strip(), format="%b %Y", errors="coerce")
+    return stamp + pd.offsets.MonthEnd(0) if pd.notna(stamp) else pd.NaT
+
+
+def parse_periods(labels) -> pd.DatetimeIndex:
+    # parse_period() over a whole header row in one to_datetime call.
+    text = pd.Index([str(label).strip() for label in labels], dtype=object)
+    stamps = pd.to_datetime(text.where(text.str.upper() != TTM_LABEL), format="%b %Y", errors="coerce")
+    return pd.DatetimeIndex(stamps) + pd.offsets.MonthEnd(0)
+
+
+class NumericStatement:
+    def __init__(self, values: pd.DataFrame, units: pd.Series, raw: pd.DataFrame = None,
+                 period_ends: pd.DatetimeIndex = None):
+        self.values = values
+        self.units = units
+        self.raw = raw
+        self._line_items = None
+        # Column dates, fiscal years and the float matrix are worked out once
+        # here or on first use, so panel builders (metrics.py) only index arrays.
+        self._period_ends = period_ends
+        self._fiscal_years = None
+        self._array = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, keep_raw: bool = False) -> "NumericStatement":
+        if df is None or df.empty or len(df.columns) < 2:
+            empty = pd.DataFrame(dtype="float64", index=pd.Index([], name="Line Item"),
+                                 columns=pd.Index([], name="Period"))
+            return cls(empty, pd.Series(dtype=object, name="Unit"), df.copy() if keep_raw and df is not None else None)
+
+        labels = [clean_label(x) for x in df.iloc[:, 0]]
+        period_labels = [str(c).strip() for c in df.columns[1:]]
+        cells = df.iloc[:, 1:].to_numpy(dtype=object)
+
+        parsed = [[parse_cell(v) for v in row] for row in cells]
+        values = np.array([[v for v, _ in row] for row in parsed], dtype="float64").reshape(len(labels), -1)
+        units = ["%" if any(p for _, p in row) else "" for row in parsed]
+
+        # Chronological column order with TTM last.
+        ends = parse_periods(period_labels)
+        order = sorted(range(len(period_labels)),
+                       key=lambda i: (pd.isna(ends[i]), ends[i] if pd.notna(ends[i]) else pd.Timestamp.min))
+
+        values_df = pd.DataFrame(
+            values[:, order],
+            index=pd.Index(labels, name="Line Item"),
+            columns=pd.Index([period_labels[i] for i in order], name="Period"),
+        )
+        raw = None
+        if keep_raw:
+            raw = pd.DataFrame(cells[:, order], index=values_df.index, columns=values_df.columns)
+        return cls(values_df, pd.Series(units, index=values_df.index, name="Unit"), raw,
+                   period_ends=ends[order])
+
+    @property
+    def empty(self) -> bool:
+        return self.values.empty
+
+    @property
+    def periods(self) -> list:
+        return list(self.values.columns)
+
+    @property
+    def period_ends(self) -> pd.DatetimeIndex:
+        if self._period_ends is None:
+            self._period_ends = parse_periods(self.values.columns)
+        return self._period_ends
+
+    @property
+    def year_end_month(self):
+        # Month the statement's fiscal years end in: the most common column
+        # month, ties going to the oldest column (interim periods such as a
+        # "Sep 2024" half-year only ever trail the annual ones). None if no
+        # column is a dated period.
+        months = self.period_ends.month[self.period_ends.notna()]
+        if not len(months):
+            return None
+        counts = pd.Series(months).value_counts(sort=False)
+        return int(counts.index[counts.to_numpy().argmax()])
+
+    @property
+    def fiscal_years(self) -> np.ndarray:
+        # Fiscal year of each column (the year its period ends); -1 for TTM,
+        # anything unparseable and interim columns that don't end in the
+        # year-end month, so they never stand in for a year-end figure.
+        if self._fiscal_years is None:
+            ends = self.period_ends
+            year_end = ends.notna() & (ends.month == self.year_end_month)
+            self._fiscal_years = np.where(year_end, ends.year, -1).astype(int)
+        return self._fiscal_years
+
+    def array(self, key: str):
+        # Row for a canonical key as a float64 array aligned with the
+        # columns, or None if absent.
+        pos = self.line_items.get(key)
+        if pos is None:
+            return None
+        if self._array is None:
+            self._array = self.values.to_numpy(dtype="float64")
+        return self._array[pos]
+
+    @property
+    def has_ttm(self) -> bool:
+        return TTM_LABEL in self.values.columns
+
+    @property
+    def annual(self) -> pd.DataFrame:
+        # Reported periods only, without the TTM column.
+        return self.values.drop(columns=[TTM_LABEL], errors="ignore")
+
+    @property
+    def latest_period(self):
+        annual = self.annual.columns
+        return annual[-1] if len(annual) else None
+
+    def row(self, label: str) -> pd.Series:
+        if label not in self.values.index:
+            return pd.Series(np.nan, index=self.values.columns, name=label)
+        row = self.values.loc[label]
+        return row.iloc[0] if isinstance(row, pd.DataFrame) else row
+
+    def latest(self, label: str, include_ttm: bool = False) -> float:
+        row = self.row(label)
+        if not include_ttm:
+            row = row.drop(TTM_LABEL, errors="ignore")
+        row = row.dropna()
+        return float(row.iloc[-1]) if len(row) else np.nan
+
+    def unit_for(self, key: str) -> str:
+        label = self.label_for(key)
+        return "" if label is None else self.unit(label)
+
+    @property
+    def line_items(self) -> dict:
+        # {canonical_key: row position}, built on first use and then reused.
+        if self._line_items is None:
+            self._line_items = build_line_item_index(self.values.index)
+        return self._line_items
+
+    def label_for(self, key: str):
+        pos = self.line_items.get(key)
+        return None if pos is None else self.values.index[pos]
+
+    def get(self, key: str) -> pd.Series:
+        # Row for a canonical key (see line_items.CANONICAL_LINE_ITEMS), all NaN if absent.
+        pos = self.line_items.get(key)
+        if pos is None:
+            return pd.Series(np.nan, index=self.values.columns, name=key)
+        return self.values.iloc[pos].rename(key)
+
+    def latest_for(self, key: str, include_ttm: bool = False) -> float:
+        row = self.get(key)
+        if not include_ttm:
+            row = row.drop(TTM_LABEL, errors="ignore")
+        row = row.dropna()
+        return float(row.iloc[-1]) if len(row) else np.nan
+
+    def unit(self, label: str) -> str:
+        if label not in self.units.index:
+            return ""
+        unit = self.units.loc[label]
+        return unit.iloc[0] if isinstance(unit, pd.Series) else unit
+
+
+def as_statement(obj, keep_raw: bool = False) -> NumericStatement:
+    return obj if isinstance(obj, NumericStatement) else NumericStatement.from_frame(obj, keep_raw=keep_raw)
+
+
+def format_value(value: float, unit: str = "") -> str:
+    if value is None or pd.isna(value):
+        return "N/A (missing)"
+    text = f"{value:,.2f}".rstrip("0").rstrip(".") if unit == "%" or abs(value) < 100 else f"{value:,.0f}"
+    return f"{text}%" if unit == "%" else text
@@ -0,0 +1,75 @@
+import threading
+
+import streamlit as st
+from langchain.callbacks.base import BaseCallbackHandler
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+# LangChain callback handlers that render tokens into the Streamlit page as
+# they arrive. The chat model must be built with streaming=True for
+# on_llm_new_token to fire.
+
+
+class StreamlitTokenHandler(BaseCallbackHandler):
+    # Streams every LLM call into its own placeholder. Used for the tools'
+    # analysis calls; the placeholder is created where the tool is writing.
+    def __init__(self, container=None):
+        self.container = container
+        self._box = None
+        self._text = ""
+        # The planner makes its analysis calls on pool threads; they draw
+        # into the page under the script run that created the handler.
+        self._script_ctx = get_script_run_ctx()
+
+    def _attach(self):
+        if self._script_ctx is not None:
+            add_script_run_ctx(threading.current_thread(), self._script_ctx)
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._attach()
+        self._start()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._attach()
+        self._start()
+
+    def _start(self):
+        self._text = ""
+        self._box = (self.container or st).empty()
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        self._text += token
+        if self._box is not None:
+            self._box.markdown(self._text + "▌")
+
+    def on_llm_end(self, response, **kwargs):
+        if self._box is not None:
+            self._box.markdown(self._text)
+
+
+class FinalAnswerStreamHandler(StreamlitTokenHandler):
+    # For the ReAct agent: its LLM calls emit Thought/Action text as well, so
+    # only what follows "Final Answer:" is shown.
+    ANSWER_PREFIX = "Final Answer:"
+
+    def __init__(self, placeholder):
+        super().__init__()
+        self.placeholder = placeholder
+        self._answering = False
+
+    def _start(self):
+        self._text = ""
+        self._answering = False
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        self._text += token
+        if not self._answering:
+            if self.ANSWER_PREFIX not in self._text:
+                return
+            self._answering = True
+        answer = self._text.split(self.ANSWER_PREFIX, 1)[1].lstrip()
+        self.placeholder.markdown(answer + "▌")
+
+    def on_llm_end(self, response, **kwargs):
+        if self._answering:
+            self.placeholder.markdown(self._text.split(self.ANSWER_PREFIX, 1)[1].strip())
@@ -0,0 +1,200 @@
+import functools
+import logging
+import os
+
+import pandas as pd
+
+from metrics import compute_metrics
+from statements import TTM_LABEL, as_statement
+from tracing import span
+
+
+# Compact text form of a company's statements for the prompts. The yearly
+# figures go in one pipe-separated table with the unit stated once, missing
+# cells are "-", and only the metrics that could be computed are listed, so
+# a company costs a fraction of the tokens of the old emoji/list-repr block
+# (which matters most in peer comparison, where it is repeated per company).
+#
+# Every summary is held to SUMMARY_TOKEN_BUDGET: if it runs over, the oldest
+# years are dropped first. Token counts use tiktoken (requirement.txt); if it
+# is missing or cannot load its encoding (it downloads it on first use), they
+# fall back to ~4 characters per token, and the budget is then approximate:
+# tokenizer_name() says so and the fallback is logged once.
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "400"))
+SUMMARY_YEARS = 5
+MIN_YEARS = 2
+TOKENIZER_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# (statement, canonical key, column header) for the yearly table.
+YEARLY_COLUMNS = (
+    ("pnl", "sales", "Sales"),
+    ("pnl", "net_profit", "NetProfit"),
+    ("cashflow", "cfo", "CFO"),
+)
+LATEST_BALANCE_SHEET = (
+    ("total_assets", "TotalAssets"),
+    ("borrowings", "Borrowings"),
+    ("cash", "Cash"),
+)
+HOLDINGS = (("promoters", "Promoter"), ("fii", "FII"))
+# (metric, label, kind): kind decides the suffix; % growth/levels, pp, x.
+METRICS = (
+    ("sales_cagr_3y", "SalesCAGR3y", "signed%"),
+    ("sales_cagr_5y", "SalesCAGR5y", "signed%"),
+    ("profit_cagr_3y", "ProfitCAGR3y", "signed%"),
+    ("profit_cagr_5y", "ProfitCAGR5y", "signed%"),
+    ("net_margin", "NetMargin", "%"),
+    ("net_margin_5y_avg", "NetMargin5yAvg", "%"),
+    ("operating_margin", "OPM", "%"),
+    ("cfo_pat", "CFO/PAT", "x"),
+    ("cfo_pat_5y", "CFO/PAT5yCum", "x"),
+    ("receivables_growth_vs_sales", "RecvGrowth-SalesGrowth", "pp"),
+    ("inventory_growth_vs_sales", "InvGrowth-SalesGrowth", "pp"),
+    ("debt_equity", "D/E", "x"),
+    ("debt_equity_prev", "D/EPrevYr", "x"),
+    ("borrowings_change", "BorrowingsYoY", "signed%"),
+    ("current_ratio", "CurrentRatio", "x"),
+    ("promoter_change_1y", "PromoterChg1y", "pp"),
+    ("promoter_change_2y", "PromoterChg2y", "pp"),
+)
+SECTION_NAMES = {"pnl": "Profit & Loss", "cashflow": "Cash Flow", "balance_sheet": "Balance Sheet",
+                 "shareholding": "Shareholding"}
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        logging.getLogger(__name__).warning("tiktoken is not installed; token budgets are approximate (chars/4)")
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logging.getLogger(__name__).warning(
+            "Could not load the tiktoken encoding for %s (%s); token budgets are approximate (chars/4)", model, e
+        )
+        return None
+
+
+def count_tokens(text: str, model: str = TOKENIZER_MODEL) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def tokenizer_name(model: str = TOKENIZER_MODEL) -> str:
+    encoding = _encoding(model)
+    return encoding.name if encoding is not None else "chars/4 estimate (approximate)"
+
+
+def _num(value) -> str:
+    if value is None or pd.isna(value):
+        return "-"
+    if abs(value) >= 100:
+        return f"{value:.0f}"
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _metric(value, kind: str) -> str:
+    if kind == "x":
+        return f"{value:.2f}"
+    if kind == "signed%":
+        return f"{value:+.1f}%"
+    if kind == "pp":
+        return f"{value:+.1f}pp"
+    return f"{value:.1f}%"
+
+
+def _period(label) -> str:
+    # "Mar 2024" -> "Mar'24"
+    text = str(label)
+    return text[:-5] + "'" + text[-2:] if text[-4:].isdigit() and text[-5] == " " else text
+
+
+def _yearly_table(stmts: dict, years: int) -> list:
+    pl = stmts["pnl"]
+    periods = list(pl.annual.columns[-years:]) if pl.label_for("sales") is not None else []
+    if not periods:
+        periods = list(stmts["cashflow"].annual.columns[-years:])
+    if pl.has_ttm:
+        periods.append(TTM_LABEL)
+    if not periods:
+        return []
+    lines = ["Year|" + "|".join(header for _, _, header in YEARLY_COLUMNS)]
+    for period in periods:
+        cells = [_num(stmts[s].get(key).get(period)) for s, key, _ in YEARLY_COLUMNS]
+        lines.append(_period(period) + "|" + "|".join(cells))
+    return lines
+
+
+def _prepare(statements: dict):
+    # (statements, fixed lines) for _render(): the parts that do not depend
+    # on how many years are shown, worked out once per summary.
+    stmts = {key: as_statement(statements[key]) for key in SECTION_NAMES}
+    lines = []
+
+    bs = stmts["balance_sheet"]
+    latest = [f"{label}={_num(bs.latest_for(key))}" for key, label in LATEST_BALANCE_SHEET
+              if bs.label_for(key) is not None]
+    if latest:
+        lines.append("Balance sheet latest: " + ", ".join(latest))
+
+    sh = stmts["shareholding"]
+    holdings = [f"{label}={_num(sh.latest_for(key))}" for key, label in HOLDINGS if sh.label_for(key) is not None]
+    if holdings:
+        lines.append("Holding % latest: " + ", ".join(holdings))
+
+    m = compute_metrics(stmts)
+    cur_a, cur_l = bs.latest_for("current_assets"), bs.latest_for("current_liabilities")
+    m["current_ratio"] = float(cur_a / cur_l) if pd.notna(cur_a) and pd.notna(cur_l) and cur_l else None
+    computed = [f"{label}={_metric(m[key], kind)}" for key, label, kind in METRICS if m.get(key) is not None]
+    if computed:
+        lines.append("Metrics (exact, latest year): " + ", ".join(computed))
+
+    missing = [name for key, name in SECTION_NAMES.items() if stmts[key].values.empty]
+    if missing:
+        lines.append("Missing: " + ", ".join(missing))
+    return stmts, lines
+
+
+def _render(prepared, years: int) -> str:
+    stmts, lines = prepared
+    return "\n".join(["Rs Cr unless noted; - = not reported"] + _yearly_table(stmts, years) + lines)
+
+
+def compact_summary(statements: dict, years: int = SUMMARY_YEARS) -> str:
+    # statements: get_all_statements()-shaped dict (raw frames or NumericStatements).
+    return _render(_prepare(statements), years)
+
+
+def budgeted_summary(statements: dict, budget: int = SUMMARY_TOKEN_BUDGET) -> str:
+    # compact_summary() with as many years as fit in the token budget. Only
+    # the yearly table changes between attempts.
+    with span("summary.build", ticker=statements.get("ticker"), budget=budget) as s:
+        prepared = _prepare(statements)
+        years = SUMMARY_YEARS
+        text = _render(prepared, years)
+        tokens = count_tokens(text)
+        while tokens > budget and years > MIN_YEARS:
+            years -= 1
+            text = _render(prepared, years)
+            tokens = count_tokens(text)
+        s.set(years=years, chars=len(text), tokens=tokens, over_budget=tokens > budget)
+        if tokens > budget:
+            logging.getLogger(__name__).warning(
+                "Summary for %s is %d tokens, over the %d budget", statements.get("ticker", "?"), tokens, budget
+            )
+        return text
+
+
+def size_report(texts: dict, model: str = TOKENIZER_MODEL) -> pd.DataFrame:
+    # {name: text} -> characters and tokens per text, for comparing formats.
+    rows = [{"name": name, "chars": len(text), "tokens": count_tokens(text, model)} for name, text in texts.items()]
+    report = pd.DataFrame(rows).set_index("name")
+    report.attrs["tokenizer"] = tokenizer_name(model)
+    return report
@@ -0,0 +1,43 @@
+import pytest
+
+import data_fetch
+
+
+@pytest.fixture
+def page_cache(monkeypatch):
+    monkeypatch.setattr(data_fetch, "_page_cache", data_fetch.OrderedDict())
+    monkeypatch.setattr(data_fetch.CompanyPage, "fetch", classmethod(lambda cls, ticker, use_cache=True: cls(ticker, "")))
+    return data_fetch._page_cache
+
+
+def test_page_cache_evicts_least_recently_used(monkeypatch, page_cache):
+    monkeypatch.setattr(data_fetch, "PAGE_CACHE_MAX_ENTRIES", 2)
+    first = data_fetch.get_company_page("A")
+    data_fetch.get_company_page("B")
+    assert data_fetch.get_company_page("A") is first  # A is now the most recent
+    data_fetch.get_company_page("C")
+    assert list(page_cache) == ["A", "C"]
+
+
+def test_expired_pages_are_dropped(monkeypatch, page_cache):
+    old = data_fetch.get_company_page("A")
+    old.fetched_at -= data_fetch.PAGE_TTL_SECONDS
+    data_fetch.get_company_page("B")
+    assert list(page_cache) == ["B"]
+    assert data_fetch.get_company_page("A") is not old
+
+
+PAGE_HTML = """<html><body><section id="profit-loss"><table>
+<thead><tr><th></th><th>Mar 2023</th><th>Mar 2024</th></tr></thead>
+<tbody><tr><td>Sales +</td><td>1,000</td><td>1,200</td></tr></tbody>
+</table></section></body></html>"""
+
+
+def test_statements_keep_raw_cells_only_when_asked():
+    page = data_fetch.CompanyPage("ABC", PAGE_HTML)
+    lean = page.statement("profit-loss")
+    assert lean.raw is None
+    assert lean.latest_for("sales") == 1200
+    raw = page.statement("profit-loss", keep_raw=True)
+    assert raw.raw.iloc[0].tolist() == ["1,000", "1,200"]
+    assert page.statement("profit-loss") is lean
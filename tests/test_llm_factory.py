@@ -0,0 +1,26 @@
+import pytest
+
+import fixtures
+import llm_cache
+import llm_factory
+
+
+@pytest.fixture
+def replay_clients(monkeypatch):
+    # Replay-mode clients need neither langchain nor an API key.
+    monkeypatch.setattr(fixtures, "FIXTURES_ACTIVE", True)
+    monkeypatch.setattr(llm_factory, "FIXTURES_ACTIVE", True)
+    monkeypatch.setattr(llm_factory, "FIXTURE_MODE", "replay")
+    monkeypatch.setattr(llm_factory, "_clients", {})
+
+
+@pytest.mark.parametrize("temperature", [None, 0.7])
+def test_deterministic_mode_pins_every_temperature(monkeypatch, replay_clients, temperature):
+    monkeypatch.setattr(llm_cache, "LLM_DETERMINISTIC", True)
+    assert llm_factory.get_chat_model("m", temperature=temperature, api_key="k").temperature == 0.0
+
+
+def test_default_temperature_is_left_to_the_library(monkeypatch, replay_clients):
+    monkeypatch.setattr(llm_cache, "LLM_DETERMINISTIC", False)
+    assert llm_factory.get_chat_model("m", api_key="k").temperature is None
+    assert llm_factory.get_chat_model("m", temperature=0.9, api_key="k").temperature == 0.9
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metrics import yearly_metrics
+from statements import NumericStatement
+
+
+def _statement(rows: dict, periods: list) -> NumericStatement:
+    df = pd.DataFrame([[label] + values for label, values in rows.items()], columns=["Line Item"] + periods)
+    return NumericStatement.from_frame(df)
+
+
+def test_interim_balance_sheet_column_stays_out_of_the_panels():
+    pnl = _statement({"Sales": ["1,000", "1,200"], "Net Profit": ["100", "150"]}, ["Mar 2023", "Mar 2024"])
+    balance_sheet = _statement(
+        {
+            "Equity Capital": ["10", "10", "10"],
+            "Reserves": ["690", "770", "890"],
+            "Borrowings": ["70", "100", "100"],
+        },
+        ["Mar 2023", "Mar 2024", "Sep 2024"],
+    )
+    assert list(balance_sheet.fiscal_years) == [2023, 2024, -1]
+
+    yearly = yearly_metrics([{"ticker": "T", "pnl": pnl, "balance_sheet": balance_sheet}])
+    debt_equity = yearly["debt_equity"]
+    assert list(debt_equity.columns) == [2023, 2024]
+    assert debt_equity.loc["T", 2024] == pytest.approx(100 / 780)
+    assert debt_equity.loc["T", 2023] == pytest.approx(70 / 700)
+
+
+def test_ttm_and_december_year_ends():
+    stmt = _statement({"Sales": ["1", "2", "3"]}, ["Dec 2022", "Dec 2023", "TTM"])
+    assert stmt.year_end_month == 12
+    assert list(stmt.fiscal_years) == [2022, 2023, -1]
+    assert np.isnan(yearly_metrics([{"ticker": "T", "pnl": stmt}])["sales"].to_numpy()).sum() == 0
@@ -0,0 +1,67 @@
+import pandas as pd
+
+import llm_cache
+import planner
+from statements import NumericStatement
+
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+
+
+class Handler:
+    def __init__(self):
+        self.prompts = []
+
+
+class RecordingModel:
+    # Stands in for a chat model; remembers which handlers each call got.
+    model_name = "stub"
+    temperature = None
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, messages, config=None, **kwargs):
+        handlers = list((config or {}).get("callbacks") or [])
+        self.calls.append(handlers)
+        for handler in handlers:
+            handler.prompts.append(messages)
+        return _Message(f"report {len(self.calls)}")
+
+
+def _statements(ticker):
+    pnl = pd.DataFrame([["Sales", "100", "120"], ["Net Profit", "10", "12"]],
+                       columns=["Line Item", "Mar 2023", "Mar 2024"])
+    data = {"ticker": ticker, "pnl": NumericStatement.from_frame(pnl)}
+    for name in ("cashflow", "balance_sheet", "shareholding"):
+        data[name] = NumericStatement.from_frame(None)
+    return {ticker: data}
+
+
+def _run(monkeypatch, tools, **kwargs):
+    monkeypatch.setattr(planner, "chat_messages", lambda system, user: [system, user])
+    monkeypatch.setattr(llm_cache, "get_llm_cache", lambda: None)
+    model = RecordingModel()
+    result = planner.run_planned_analysis("ABC", "health check", tools, statements=_statements("ABC"),
+                                          client=model, **kwargs)
+    return model, result
+
+
+def test_single_tool_plan_streams_its_report_as_the_answer(monkeypatch):
+    answer = Handler()
+    model, result = _run(monkeypatch, [planner.FUNDAMENTAL], callbacks=[answer])
+    assert result["output"] == "report 1"
+    assert model.calls == [[answer]]
+    assert len(answer.prompts) == 1
+
+
+def test_each_pooled_analysis_gets_its_own_handlers(monkeypatch):
+    fundamental, answer = Handler(), Handler()
+    model, _ = _run(monkeypatch, [planner.FUNDAMENTAL, planner.FORENSIC], callbacks=[answer],
+                    tool_callbacks={planner.FUNDAMENTAL: [fundamental]})
+    assert [fundamental] in model.calls
+    assert len(fundamental.prompts) == 1
+    # The answer handlers only see the synthesis, the last call.
+    assert model.calls[-1] == [answer]
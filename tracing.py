@@ -0,0 +1,244 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Timing spans for the stages of a run: HTTP fetch, HTML parse, summary
+# build, prompt size, LLM call and agent step. Each span carries a ticker and
+# whatever the stage knows (bytes, tokens, cache hit/miss, error). Spans
+# opened inside trace() are collected on that trace, which exports them as
+# plain JSON records or as OTLP/JSON (resourceSpans) for an OpenTelemetry
+# collector; app.py shows them as a timing panel. Outside a trace, spans
+# only go to the "tracing" logger (finished spans at DEBUG, failures at
+# WARNING).
+#
+# TRACE_EXPORT_PATH appends every finished trace to that file, one line per
+# trace, in TRACE_EXPORT_FORMAT ("json" records or "otlp").
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+TRACE_EXPORT_FORMAT = os.getenv("TRACE_EXPORT_FORMAT", "json").lower()
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "screener-agent")
+
+log = logging.getLogger("tracing")
+
+_trace = contextvars.ContextVar("trace", default=None)
+_span = contextvars.ContextVar("span", default=None)
+_export_lock = threading.Lock()
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str = None, parent_id: str = None, attributes: dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attributes = {}
+        self.set(**(attributes or {}))
+        self.status = "ok"
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter_ns()
+
+    def set(self, **attributes) -> "Span":
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+        return self
+
+    def fail(self, exc: BaseException):
+        # Marks the span failed without raising; span() calls this for
+        # exceptions that escape, callers that swallow an error call it too.
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = self.start_ns + (time.perf_counter_ns() - self._started)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else self.start_ns + (time.perf_counter_ns() - self._started)
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": dict(self.attributes),
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+class Trace:
+    # The spans of one run. Spans may finish on several threads at once.
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = _new_id(16)
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def records(self) -> list:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        return [s.to_dict() for s in spans]
+
+    def to_json(self, indent: int = None) -> str:
+        return json.dumps(self.records(), indent=indent, ensure_ascii=False, default=str)
+
+    def to_otlp(self) -> dict:
+        spans = []
+        for r in self.records():
+            spans.append({
+                "traceId": r["trace_id"],
+                "spanId": r["span_id"],
+                "parentSpanId": r["parent_id"] or "",
+                "name": r["name"],
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(r["start_ns"]),
+                "endTimeUnixNano": str(r["end_ns"]),
+                "attributes": _otlp_attributes(r["attributes"]),
+                "status": {"code": 2, "message": r["error"]} if r["status"] == "error" else {"code": 1},
+            })
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+        }]}
+
+    def rows(self) -> list:
+        # Flat rows for a table: offset from the trace start, nesting depth,
+        # duration, status and attributes as text.
+        records = self.records()
+        if not records:
+            return []
+        origin = records[0]["start_ns"]
+        parents = {r["span_id"]: r["parent_id"] for r in records}
+
+        def depth(span_id):
+            n, parent = 0, parents.get(span_id)
+            while parent in parents:
+                n, parent = n + 1, parents[parent]
+            return n
+
+        return [{
+            "stage": "  " * depth(r["span_id"]) + r["name"],
+            "start_ms": round((r["start_ns"] - origin) / 1e6, 1),
+            "duration_ms": round(r["duration_ms"], 1),
+            "status": r["error"] or r["status"],
+            "attributes": ", ".join(f"{k}={v}" for k, v in r["attributes"].items()),
+        } for r in records]
+
+    def stage_totals(self) -> dict:
+        # {span name: {"count", "total_ms"}}
+        totals = {}
+        for r in self.records():
+            entry = totals.setdefault(r["name"], {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + r["duration_ms"], 3)
+        return totals
+
+
+def _finish(trace, span: Span):
+    span.end()
+    if trace is not None:
+        trace.add(span)
+    if span.status == "error":
+        log.warning("%s failed after %.1f ms %s: %s", span.name, span.duration_ms, span.attributes, span.error)
+    elif log.isEnabledFor(logging.DEBUG):
+        log.debug("%s %.1f ms %s", span.name, span.duration_ms, span.attributes)
+
+
+def current_trace():
+    return _trace.get()
+
+
+def current_span():
+    return _span.get()
+
+
+def annotate(**attributes):
+    # Adds attributes to the innermost open span, if any.
+    span = _span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    trace, parent = _trace.get(), _span.get()
+    s = Span(name, trace.trace_id if trace else None, parent.span_id if parent else None, attributes)
+    token = _span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.fail(e)
+        raise
+    finally:
+        _span.reset(token)
+        _finish(trace, s)
+
+
+@contextmanager
+def trace(name: str, **attributes):
+    # Collects every span opened inside the block, under a root span `name`.
+    t = Trace(name)
+    token = _trace.set(t)
+    parent = _span.set(None)
+    try:
+        with span(name, **attributes):
+            yield t
+    finally:
+        _span.reset(parent)
+        _trace.reset(token)
+        if TRACE_EXPORT_PATH:
+            export(t, TRACE_EXPORT_PATH, TRACE_EXPORT_FORMAT)
+
+
+def export(t: Trace, path: str, fmt: str = "json"):
+    line = json.dumps(t.to_otlp()) if fmt == "otlp" else t.to_json()
+    with _export_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def in_context(fn):
+    # Pool threads start with an empty context; this carries the caller's
+    # trace and parent span over, so their spans land on the same trace.
+    trace, parent = _trace.get(), _span.get()
+
+    def run(*args, **kwargs):
+        t_token, s_token = _trace.set(trace), _span.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _span.reset(s_token)
+            _trace.reset(t_token)
+    return run